@@ -0,0 +1,81 @@
+"""
+Measures CommonIssuesFixer on a converted English WebVTT file,
+with encoding fixes skipped for clean lines, and with ftfy running on every line
+
+Usage: python benchmarks/bench_fix_encoding.py [--lines N] [--runs N]
+"""
+import argparse
+import random
+import timeit
+from contextlib import contextmanager
+
+from ftfy import fix_encoding
+
+from subby import CommonIssuesFixer, WebVTTConverter
+from subby.processors import common_issues
+from subby.utils.time import timestamp_from_ms
+
+TEXTS = [
+    "- Where are you going?\n- Out.",
+    "<i>Previously on...</i>",
+    "I don't know what you're talking about.",
+    "[door creaks]",
+    "We need to talk, Mr. Smith.",
+    "JOHN: It's fine. It's really fine.",
+    "<i>It's been a long time...</i>",
+    "Okay.",
+]
+# Non-ASCII lines, which can't be skipped for the whole file
+EXTRA_TEXTS = ["♪ Playing on the radio ♪", "It’s not what you think.", "Café?"]
+
+
+def make_vtt(lines: int, ascii_only: bool) -> str:
+    """Returns WebVTT subtitles with a given number of lines"""
+    rng = random.Random(0)
+    texts = TEXTS if ascii_only else TEXTS + EXTRA_TEXTS
+    cues = ['WEBVTT\n']
+    for i in range(lines):
+        start = i * 2500
+        cues.append(f'{timestamp_from_ms(start)} --> {timestamp_from_ms(start + 2000)}\n{rng.choice(texts)}\n')
+    return '\n'.join(cues)
+
+
+@contextmanager
+def ftfy_on_every_line():
+    """Runs ftfy on every line, as before clean lines were skipped"""
+    rules, rules_without_encoding = common_issues.LINE_RULES.copy(), common_issues.LINE_RULES_WITHOUT_ENCODING.copy()
+    common_issues.LINE_RULES[:] = [
+        rule._replace(replacement=fix_encoding) if rule.replacement is common_issues._fix_encoding else rule
+        for rule in rules
+    ]
+    common_issues.LINE_RULES_WITHOUT_ENCODING[:] = common_issues.LINE_RULES
+    try:
+        yield
+    finally:
+        common_issues.LINE_RULES[:] = rules
+        common_issues.LINE_RULES_WITHOUT_ENCODING[:] = rules_without_encoding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    def fix(srt):
+        return CommonIssuesFixer().from_srt(srt)[0]
+
+    for name, ascii_only in (('ASCII', True), ('non-ASCII', False)):
+        srt = WebVTTConverter().from_string(make_vtt(args.lines, ascii_only))
+        skipped = min(timeit.repeat(lambda: fix(srt), number=1, repeat=args.runs))
+        with ftfy_on_every_line():
+            expected = fix(srt)
+            every_line = min(timeit.repeat(lambda: fix(srt), number=1, repeat=args.runs))
+        assert fix(srt) == expected
+
+        print(f'{name:<10} ftfy on every line {every_line * 1000:8.1f} ms, clean lines skipped {skipped * 1000:8.1f} ms'
+              f' ({every_line / skipped:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Measures import cost of subby entry points (on top of interpreter startup)
+
+Usage: python benchmarks/bench_import.py [--runs N] [--max-ms MS]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = {
+    'subby': 'import subby',
+    'subby.cli': 'import subby.cli',
+    'subby version': 'from subby.cli import main; main(["version"], standalone_mode=False)',
+    'WebVTTConverter': 'from subby import WebVTTConverter',
+    'SMPTEConverter': 'from subby import SMPTEConverter',
+    'WVTTConverter': 'from subby import WVTTConverter',
+    'CommonIssuesFixer': 'from subby import CommonIssuesFixer',
+    'SDHStripper': 'from subby import SDHStripper',
+}
+
+
+def measure(statement: str, runs: int) -> float:
+    """Returns median wall time of running statement in a new interpreter (ms)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, default=None, help='Fail if any entry point costs more')
+    args = parser.parse_args()
+
+    baseline = measure('pass', args.runs)
+    print(f'{"interpreter startup":<20} {baseline:8.1f} ms')
+
+    failed = []
+    for name, statement in ENTRY_POINTS.items():
+        cost = measure(statement, args.runs) - baseline
+        print(f'{name:<20} {cost:+8.1f} ms')
+        if args.max_ms is not None and cost > args.max_ms:
+            failed.append(name)
+
+    if failed:
+        sys.exit(f'Import cost over {args.max_ms} ms: {", ".join(failed)}')
+
+
+if __name__ == '__main__':
+    main()
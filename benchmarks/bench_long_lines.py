@@ -0,0 +1,86 @@
+"""
+Measures CommonIssuesFixer on long cues without line breaks (as in live and Amazon subtitles),
+with line splits done by linear scans, and with the `(.*)` patterns they replaced
+
+Usage: python benchmarks/bench_long_lines.py [--size N] [--lines N] [--runs N]
+"""
+import argparse
+import random
+import re
+import timeit
+from contextlib import contextmanager
+
+from subby import CommonIssuesFixer
+from subby import regex as Regex
+from subby.processors import common_issues
+
+WORDS = ['and', 'the', 'ball', 'goes', 'wide', 'corner', 'kick', 'for', 'United', 'what', 'a', 'save', '( crowd )',
+         '[cheering]', 'Mr.', 'Smith', 'yes!', 'no...', '♪', '<i>la</i>', 'wait:', 'right?', 'OK.']
+PATTERNS = {
+    common_issues._split_after_brackets: (r'(.*)([^.][\]\)])([A-Z][^.])', r'\1\2\n\3', 0),
+    common_issues._split_after_sentences: (
+        r'(.*)([^\.\sA-Z][!\.;:?])(?<!(?:Mr|Ms)\.)(?<!Mrs\.)([A-Z][^.])', r'- \1\2\n- \3', 0
+    ),
+    common_issues._move_notes_into_italics: (r'(♪.*)</i>\s*♪', r'\1 ♪</i>', 0),
+    common_issues._remove_spaces_in_brackets: (r'\( (.*) \)', r'(\1)', 0),
+}
+
+
+def make_lines(size: int, lines: int) -> list[str]:
+    """Returns cues with a given number of characters"""
+    rng = random.Random(0)
+    cues = []
+    for _ in range(lines):
+        words = []
+        while sum(map(len, words)) + len(words) < size:
+            words.append(rng.choice(WORDS))
+        cues.append(' '.join(words))
+    return cues
+
+
+@contextmanager
+def greedy_patterns():
+    """Runs line splits with `(.*)` patterns, as before they were replaced with linear scans"""
+    rules, rules_without_encoding = common_issues.LINE_RULES.copy(), common_issues.LINE_RULES_WITHOUT_ENCODING.copy()
+
+    def replace(rule):
+        if rule.replacement in PATTERNS:
+            pattern, replacement, flags = PATTERNS[rule.replacement]
+            return rule._replace(pattern=re.compile(pattern, flags), replacement=replacement)
+        if rule.pattern is not None and rule.pattern.pattern.startswith(r'(?<!\.)\.{2,}'):
+            return rule._replace(pattern=re.compile(r'\.{2,}' rf'({Regex.TAGS})?' r'\s*$', re.M))
+        return rule
+
+    common_issues.LINE_RULES[:] = map(replace, rules)
+    common_issues.LINE_RULES_WITHOUT_ENCODING[:] = map(replace, rules_without_encoding)
+    try:
+        yield
+    finally:
+        common_issues.LINE_RULES[:] = rules
+        common_issues.LINE_RULES_WITHOUT_ENCODING[:] = rules_without_encoding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=2000)
+    parser.add_argument('--lines', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    cues = make_lines(args.size, args.lines)
+
+    def fix():
+        return [CommonIssuesFixer._fix_content(cue) for cue in cues]
+
+    linear = min(timeit.repeat(fix, number=1, repeat=args.runs))
+    expected = fix()
+    with greedy_patterns():
+        assert fix() == expected
+        greedy = min(timeit.repeat(fix, number=1, repeat=args.runs))
+
+    print(f'{args.lines} lines of {args.size} characters: (.*) patterns {greedy * 1000:8.1f} ms,'
+          f' linear scans {linear * 1000:8.1f} ms ({greedy / linear:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures SDHStripper on malformed lines (unclosed brackets, long runs of spaces or line breaks),
+which made regexes backtrack exponentially before they were made linear
+
+Usage: python benchmarks/bench_sdh_adversarial.py [--size N] [--budget SECONDS]
+"""
+import argparse
+import sys
+import time
+
+from subby import SDHStripper
+
+
+def make_lines(size: int) -> list[str]:
+    """Returns adversarial lines, with runs of whitespace of a given size"""
+    # Anchored patterns are retried on each line start, so blank lines are fewer
+    lines = size // 10
+    return [
+        '[' + ' ' * size + 'x',
+        '[' + ' \n' * lines + 'x',
+        '(' + '\n' * lines + 'x',
+        '- [' + ' \n' * lines,
+        ' \n' * lines + 'x(y)',
+        '\n' * lines + '[',
+        '-' + ' ' * size + 'x',
+        '- ' + ' ' * size + ':',
+        ' ' * size + '<i>' + ' ' * size + '-x',
+        'JOHN' + ' ' * size + 'x',
+        'JOHN (' + ' ' * size + 'x',
+        '<i>-' + ' ' * size + '(whispering)' + ' ' * size + 'x',
+        '[music' + ' ' * size + ']' + ' ' * size + 'x',
+        '♪' + ' ' * size + 'x',
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=5000)
+    parser.add_argument('--budget', type=float, default=0.5, help='time budget for each line')
+    args = parser.parse_args()
+
+    stripper = SDHStripper()
+    over_budget = 0
+    for content in make_lines(args.size):
+        start = time.perf_counter()
+        stripper._strip_content(content)
+        timing = time.perf_counter() - start
+        over_budget += timing > args.budget
+        print(f'{content[:12]!r:<20} {len(content):>7} chars {timing * 1000:8.1f} ms')
+
+    if over_budget:
+        sys.exit(f'{over_budget} lines over the budget of {args.budget} seconds')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares subby.subripfile.parse_srt with srt.parse on a generated srt file
+
+Usage: python benchmarks/bench_srt_parse.py [--lines N] [--runs N]
+"""
+import argparse
+import timeit
+from datetime import timedelta
+
+import srt
+
+from subby.subripfile import parse_srt
+
+
+def make_srt(lines: int) -> str:
+    """Returns srt subtitles with a given number of lines"""
+    blocks = []
+    for i in range(lines):
+        start = i * 2000
+        end = start + 1500
+        blocks.append(srt.Subtitle(
+            index=i + 1,
+            start=timedelta(milliseconds=start),
+            end=timedelta(milliseconds=end),
+            content=f'- Line number {i}.\n- <i>Second line of text</i>'
+        ).to_srt())
+    return ''.join(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    source = make_srt(args.lines)
+    assert list(parse_srt(source)) == list(srt.parse(source, ignore_errors=True))
+
+    timings = {
+        'srt.parse': min(timeit.repeat(
+            lambda: list(srt.parse(source, ignore_errors=True)), number=1, repeat=args.runs
+        )),
+        'parse_srt': min(timeit.repeat(lambda: list(parse_srt(source)), number=1, repeat=args.runs)),
+    }
+    for name, timing in timings.items():
+        print(f'{name:<10} {timing * 1000:8.1f} ms ({args.lines / timing:,.0f} lines/s)')
+    print(f'speedup    {timings["srt.parse"] / timings["parse_srt"]:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
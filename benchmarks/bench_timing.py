@@ -0,0 +1,75 @@
+"""
+Measures CommonIssuesFixer timing passes on a generated live sports caption file
+
+Live captions are rolled up line by line, with lines repeated or continued in the next cue,
+back-to-back cues and short gaps, and time codes past 24 hours.
+
+Usage: python benchmarks/bench_timing.py [--lines N] [--runs N]
+"""
+import argparse
+import random
+import timeit
+from datetime import timedelta
+
+from subby import CommonIssuesFixer
+from subby.subripfile import CompactSubRipFile
+
+WORDS = ['and', 'the', 'ball', 'goes', 'wide', 'corner', 'kick', 'for', 'united', 'what', 'a', 'save']
+# Live content often starts at a time of day (or later), past the first 24 hours
+START_MS = 26 * 3600000
+
+
+def make_captions(lines: int) -> CompactSubRipFile:
+    """Returns live captions with a given number of lines"""
+    rng = random.Random(0)
+    captions = CompactSubRipFile()
+    start = START_MS
+    text = ''
+    for i in range(lines):
+        kind = rng.random()
+        if kind < 0.3:
+            # Continued line
+            text = f'{text} {rng.choice(WORDS)}'.strip()
+        elif kind < 0.4:
+            # Repeated line
+            pass
+        else:
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+        duration = rng.randint(300, 3000)
+        captions.indexes.append(i + 1)
+        captions.starts.append(start)
+        captions.ends.append(start + duration)
+        captions.contents.append(text)
+        captions.proprietary.append('')
+        # Back-to-back, overlapping, short or longer gaps
+        start += duration + rng.choice((0, 0, 1, 5, 40, 80, 200, 500))
+    return captions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    captions = make_captions(args.lines)
+    fixer = CommonIssuesFixer()
+    fixed, _ = fixer._fix_time_codes(CompactSubRipFile(captions))
+    combined, _ = fixer._combine_timecodes(CompactSubRipFile(fixed))
+
+    passes = {
+        '_fix_time_codes': lambda: fixer._fix_time_codes(CompactSubRipFile(captions)),
+        '_combine_timecodes': lambda: fixer._combine_timecodes(CompactSubRipFile(fixed)),
+        '_remove_gaps': lambda: fixer._remove_gaps(CompactSubRipFile(combined)),
+        'offset': lambda: CompactSubRipFile(captions).offset(timedelta(seconds=-1)),
+        'clean_indexes': lambda: CompactSubRipFile(captions).clean_indexes(),
+        # Copying is included in all of the above
+        '(copy)': lambda: CompactSubRipFile(captions),
+    }
+    for name, run in passes.items():
+        timing = min(timeit.repeat(run, number=1, repeat=args.runs))
+        print(f'{name:<20} {timing * 1000:8.1f} ms ({args.lines / timing:,.0f} lines/s)')
+
+
+if __name__ == '__main__':
+    main()
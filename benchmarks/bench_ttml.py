@@ -0,0 +1,92 @@
+"""
+Measures converting a large DFXP/TTML file, streamed from its data with lxml and decoded and parsed as a whole
+with BeautifulSoup, and peak memory of each (measured in a separate process, on Linux)
+
+Usage: python benchmarks/bench_ttml.py [--lines N] [--runs N]
+"""
+import argparse
+import random
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+from subby.converters.smpte import _SMPTEConverter, _SMPTEStreamConverter
+
+HEAD = '''<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling"
+    xmlns:ttp="http://www.w3.org/ns/ttml#parameter" ttp:tickRate="10000000">
+<head>
+<styling><style xml:id="italic" tts:fontStyle="italic"/><style xml:id="normal" tts:fontStyle="normal"/></styling>
+<layout><region xml:id="top" tts:displayAlign="before"/><region xml:id="bottom" tts:displayAlign="after"/></layout>
+</head>
+<body><div>
+'''
+
+TEXTS = [
+    'Where are you going?<br/>Out.',
+    '<span style="italic">[door creaks]</span>',
+    'We need to talk, Mr. Smith &amp; Mrs. Smith.',
+    '<span tts:fontStyle="italic">It\'s been a long time...</span><br/>Too long.',
+]
+
+ENGINES = {
+    'lxml': _SMPTEStreamConverter,
+    'BeautifulSoup': lambda data: _SMPTEConverter(str(data, 'utf-8')),
+}
+
+
+def make_ttml(lines: int) -> bytes:
+    """Returns a TTML document with a given number of lines"""
+    rng = random.Random(0)
+    parts = [HEAD]
+    for i in range(lines):
+        start = i * 25000000
+        region = rng.choice(['top', 'bottom'])
+        parts.append(f'<p begin="{start}t" end="{start + 20000000}t" region="{region}">{rng.choice(TEXTS)}</p>\n')
+    parts.append('</div></body>\n</tt>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def peak_rss() -> int:
+    """Returns peak resident memory of this process (kB), which unlike ru_maxrss isn't inherited from the parent"""
+    for line in Path('/proc/self/status').read_text().splitlines():
+        if line.startswith('VmHWM:'):
+            return int(line.split()[1])
+    raise OSError('VmHWM not available')
+
+
+def peak_memory(engine: str, lines: int) -> str:
+    """Returns increase of peak memory when converting in a separate process"""
+    try:
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--lines', str(lines), '--memory', engine], stderr=subprocess.DEVNULL
+        )
+    except subprocess.CalledProcessError:
+        return 'n/a'
+    return f'+{float(output):.1f} MB'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--memory', choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    data = make_ttml(args.lines)
+    if args.memory:
+        before = peak_rss()
+        ENGINES[args.memory](data)
+        print((peak_rss() - before) / 1024)
+        return
+
+    assert ENGINES['lxml'](data).srt == ENGINES['BeautifulSoup'](data).srt
+    print(f'{args.lines} lines, {len(data) / 1024 / 1024:.1f} MB:')
+    for engine, converter in ENGINES.items():
+        elapsed = min(timeit.repeat(lambda: converter(data), number=1, repeat=args.runs))
+        print(f'  {engine:14} {elapsed * 1000:8.1f} ms, peak memory {peak_memory(engine, args.lines)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,19 @@
-from subby.converters.bilibili_json import BilibiliJSONConverter
-from subby.converters.mp4 import ISMTConverter, WVTTConverter
-from subby.converters.sami import SAMIConverter
-from subby.converters.smpte import SMPTEConverter
-from subby.converters.webvtt import WebVTTConverter
-from subby.processors.common_issues import CommonIssuesFixer
-from subby.processors.sdh import SDHStripper
-from subby.subripfile import SubRipFile
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from subby.converters.bilibili_json import BilibiliJSONConverter
+    from subby.converters.mp4 import ISMTConverter, WVTTConverter
+    from subby.converters.sami import SAMIConverter
+    from subby.converters.smpte import SMPTEConverter
+    from subby.converters.webvtt import WebVTTConverter
+    from subby.pipeline import Pipeline
+    from subby.processors.cache import LineCache
+    from subby.processors.common_issues import CommonIssuesFixer
+    from subby.processors.sdh import SDHStripper
+    from subby.subripfile import SubRipFile
 
 __version__ = '0.3.27'
 
@@ -18,8 +26,39 @@ __all__ = [
     # Processors
     'CommonIssuesFixer',
     'SDHStripper',
+    'Pipeline',
     # Utility
     'SubRipFile',
+    'LineCache',
     # Version
     '__version__'
 ]
+
+# Classes are imported on first access,
+# so that only dependencies of the classes actually used are loaded
+_LAZY_ATTRIBUTES = {
+    'BilibiliJSONConverter': 'subby.converters.bilibili_json',
+    'ISMTConverter': 'subby.converters.mp4',
+    'WVTTConverter': 'subby.converters.mp4',
+    'SAMIConverter': 'subby.converters.sami',
+    'SMPTEConverter': 'subby.converters.smpte',
+    'WebVTTConverter': 'subby.converters.webvtt',
+    'CommonIssuesFixer': 'subby.processors.common_issues',
+    'SDHStripper': 'subby.processors.sdh',
+    'Pipeline': 'subby.pipeline',
+    'SubRipFile': 'subby.subripfile',
+    'LineCache': 'subby.processors.cache',
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value  # cache, so that __getattr__ is only called once
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
@@ -0,0 +1,184 @@
+"""
+asyncio front-end for converters and processors
+
+Conversion and processing run in a bounded pool of threads, so that they don't block the event loop.
+Only a limited number of jobs is submitted to the pool at once, others wait (and can be cancelled) in the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, TypeVar, Union
+from weakref import WeakKeyDictionary
+
+from srt import Subtitle
+
+from subby.converters.base import BaseConverter
+from subby.processors.base import BaseProcessor
+from subby.subripfile import SubRipFile
+
+R = TypeVar('R')
+
+# Marks the end of streamed cues
+_END = object()
+
+
+class AsyncRunner:
+    """
+    Runs conversion and processing in a pool of threads, awaiting results in the event loop
+
+    At most `limit` jobs (by default, the number of workers) are running or queued in the executor at once,
+    further jobs wait for a free slot. Cancelling a waiting job removes it, a job which is already running
+    keeps its slot until it finishes (threads can't be interrupted, use `SDHStripper(deadline=...)` to bound them).
+    """
+
+    def __init__(self, workers: int | None = None, limit: int | None = None, executor: Executor | None = None):
+        # Same default number of threads as ThreadPoolExecutor
+        workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.limit = limit or workers
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix='subby')
+        # Semaphores are bound to the event loop they're used in
+        self._slots: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+    async def __aenter__(self) -> AsyncRunner:
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the executor (if it was created by the runner), cancelling jobs which haven't started"""
+        if self._own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, function: Callable[..., R], *args) -> R:
+        """Runs a function in the executor once there's a free slot, returns its result"""
+        future = await self._submit(function, *args)
+        return await asyncio.wrap_future(future)
+
+    async def convert(self, converter: BaseConverter, data: Union[Path, str, bytes]) -> SubRipFile:
+        """Converts a given file (path), string or bytes to srt"""
+        return await self.run(converter._convert_input, data)
+
+    async def process(
+        self,
+        processor: BaseProcessor,
+        data: Union[SubRipFile, Path, str],
+        language: str | None = None
+    ) -> tuple[SubRipFile, bool]:
+        """Processes a given SubRipFile, srt file (path) or string"""
+        return await self.run(processor._process_input, data, language)
+
+    async def iter_cues(
+        self,
+        converter: BaseConverter,
+        data: Union[Path, bytes, BinaryIO],
+        buffer: int = 100
+    ) -> AsyncIterator[Subtitle]:
+        """
+        Converts a given file (path), bytes or binary stream, yielding lines as soon as they're converted
+
+        Converting stops while `buffer` lines are waiting to be consumed, and once the iterator is closed
+        (when iteration is stopped early, close it with `aclose()` to free its slot right away)
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        stopped = threading.Event()
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce():
+            try:
+                for cue in _iter_input(converter, data):
+                    if stopped.is_set():
+                        return
+                    put(cue)
+            finally:
+                if not stopped.is_set():
+                    put(_END)
+
+        future = await self._submit(produce)
+        try:
+            while (cue := await queue.get()) is not _END:
+                yield cue
+            # Raises conversion errors
+            await asyncio.wrap_future(future)
+        finally:
+            stopped.set()
+            future.cancel()
+            # Unblock the converting thread, if it's waiting for space in the queue
+            while not queue.empty():
+                queue.get_nowait()
+
+    async def _submit(self, function: Callable[..., R], *args) -> Future:
+        """Submits a function to the executor once there's a free slot, which is released when it's done"""
+        loop = asyncio.get_running_loop()
+        if (slots := self._slots.get(loop)) is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.limit)
+
+        await slots.acquire()
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        return future
+
+
+def _iter_input(converter: BaseConverter, data: Union[Path, bytes, BinaryIO]) -> Iterator[Subtitle]:
+    if isinstance(data, Path):
+        with data.open(mode='rb') as stream:
+            yield from converter.iter_parse(stream)
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        yield from converter.iter_parse(BytesIO(data))
+    else:
+        yield from converter.iter_parse(data)
+
+
+_default_runner: AsyncRunner | None = None
+_default_runner_lock = threading.Lock()
+
+
+def default_runner() -> AsyncRunner:
+    """Returns the runner used by module-level functions, created on first use"""
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = AsyncRunner()
+        return _default_runner
+
+
+async def convert(
+    converter: BaseConverter,
+    data: Union[Path, str, bytes],
+    runner: AsyncRunner | None = None
+) -> SubRipFile:
+    """Converts a given file (path), string or bytes to srt, without blocking the event loop"""
+    return await (runner or default_runner()).convert(converter, data)
+
+
+async def process(
+    processor: BaseProcessor,
+    data: Union[SubRipFile, Path, str],
+    language: str | None = None,
+    runner: AsyncRunner | None = None
+) -> tuple[SubRipFile, bool]:
+    """Processes a given SubRipFile, srt file (path) or string, without blocking the event loop"""
+    return await (runner or default_runner()).process(processor, data, language)
+
+
+def iter_cues(
+    converter: BaseConverter,
+    data: Union[Path, bytes, BinaryIO],
+    buffer: int = 100,
+    runner: AsyncRunner | None = None
+) -> AsyncIterator[Subtitle]:
+    """Converts a given file (path), bytes or binary stream, yielding lines as soon as they're converted"""
+    return (runner or default_runner()).iter_cues(converter, data, buffer)
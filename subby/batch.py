@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import glob
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from subby.detect import Format, detect_file
+from subby.processors.cache import LineCache
+from subby.processors.common_issues import CommonIssuesFixer
+from subby.processors.sdh import SDHStripper
+
+# Lines processed in this process, shared between files as lines often repeat across episodes
+LINE_CACHE = LineCache()
+
+
+class BatchResult(NamedTuple):
+    """Result of converting a single file"""
+    file: Path
+    format: str
+    size: int = 0
+    lines: int = 0
+    duration: float = 0
+    outputs: tuple[Path, ...] = ()
+    error: str | None = None
+
+
+def find_inputs(pattern: str) -> list[Path]:
+    """Returns files in a given directory, or files matching a given glob pattern"""
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(file for file in path.iterdir() if file.is_file())
+    return sorted(Path(file) for file in glob.glob(pattern, recursive=True) if Path(file).is_file())
+
+
+def detect_inputs(files: Iterable[Path]) -> tuple[list[tuple[Path, Format]], list[Path]]:
+    """Returns detected files with their format, and files which weren't recognized"""
+    detected, unrecognized = [], []
+    for file in files:
+        if subtitle_format := detect_file(file):
+            detected.append((file, subtitle_format))
+        else:
+            unrecognized.append(file)
+    return detected, unrecognized
+
+
+def preload(formats: Iterable[Format]):
+    """
+    Imports converters for given formats
+
+    Worker processes forked afterwards inherit them (and processors imported by this module),
+    instead of each importing them again
+    """
+    for subtitle_format in formats:
+        _ = subtitle_format.converter
+
+
+def convert_file(
+    file: Path,
+    subtitle_format: Format,
+    out: Path | None = None,
+    language: str | None = None,
+    encoding: str = 'utf-8',
+    strip_sdh: bool = False,
+    keep_short_gaps: bool = False,
+    keep_suffix: bool = False
+) -> BatchResult:
+    """
+    Converts a given file to srt and fixes common issues, optionally saving a copy with SDH stripped
+
+    Output is saved to `out` directory (or next to the input file), errors are returned in the result
+    """
+    start = time.perf_counter()
+    output = output_path(file, out, keep_suffix)
+    outputs = [output]
+    try:
+        srt = subtitle_format.converter().from_file(file)
+        # Converted and saved subtitles aren't needed afterwards, so they are processed without copying
+        processor = CommonIssuesFixer(cache=LINE_CACHE, inplace=True, remove_gaps=not keep_short_gaps)
+        srt, _ = processor.from_srt(srt, language=language)
+        srt.save(output, encoding=encoding)
+        lines = len(srt)
+        size = file.stat().st_size
+
+        if strip_sdh:
+            stripped, status = SDHStripper(cache=LINE_CACHE, inplace=True).from_srt(srt, language=language)
+            if status:
+                stripped, _ = processor.from_srt(stripped, language=language)
+                outputs.append(output.with_stem(output.stem + '_sdh_stripped'))
+                stripped.save(outputs[-1], encoding=encoding)
+    except Exception as e:  # pylint: disable=broad-except
+        return BatchResult(file, subtitle_format.name, error=f'{type(e).__name__}: {e}')
+
+    return BatchResult(
+        file,
+        subtitle_format.name,
+        size=size,
+        lines=lines,
+        duration=time.perf_counter() - start,
+        outputs=tuple(outputs)
+    )
+
+
+def output_path(file: Path, out: Path | None = None, keep_suffix: bool = False) -> Path:
+    """Returns path of srt converted from a given file, keeping its suffix (e.g. "ep1.dfxp.srt") if requested"""
+    name = file.name + '.srt' if keep_suffix else file.with_suffix('.srt').name
+    return (out or file.parent) / name
+
+
+def convert_files(
+    inputs: Iterable[tuple[Path, Format]],
+    workers: int | None = None,
+    **kwargs
+) -> Iterator[BatchResult]:
+    """
+    Converts given files (with their detected formats) using `convert_file`, in a pool of worker processes
+
+    Results are yielded in order of inputs, keyword arguments are passed to `convert_file`.
+    Files which would be converted to the same output (e.g. "ep1.vtt" and "ep1.dfxp") keep their suffix
+    in output names, files whose outputs still clash aren't converted and are reported as errors
+    """
+    inputs = list(inputs)
+    keep_suffix = _keep_suffix([file for file, _ in inputs], kwargs.get('out'))
+    clashing = [
+        BatchResult(file, subtitle_format.name, error='Output would be overwritten by another file')
+        if keep is None else None
+        for (file, subtitle_format), keep in zip(inputs, keep_suffix)
+    ]
+
+    if workers == 1 or len(inputs) < 2:
+        for (file, subtitle_format), keep, error in zip(inputs, keep_suffix, clashing):
+            yield error or convert_file(file, subtitle_format, keep_suffix=keep, **kwargs)
+        return
+
+    preload({subtitle_format for _, subtitle_format in inputs})
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            None if error else executor.submit(convert_file, file, subtitle_format, keep_suffix=keep, **kwargs)
+            for (file, subtitle_format), keep, error in zip(inputs, keep_suffix, clashing)
+        ]
+        for future, error in zip(futures, clashing):
+            yield error or future.result()
+
+
+def _keep_suffix(files: list[Path], out: Path | None) -> list[bool | None]:
+    """
+    Returns whether each file should keep its suffix in the output name, as its output would clash with another one's
+
+    None is returned for files whose outputs clash even then
+    """
+    names = Counter(output_path(file, out) for file in files)
+    keep_suffix = [names[output_path(file, out)] > 1 for file in files]
+    outputs = Counter(output_path(file, out, keep) for file, keep in zip(files, keep_suffix))
+    return [
+        None if outputs[output_path(file, out, keep)] > 1 else keep
+        for file, keep in zip(files, keep_suffix)
+    ]
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 import logging
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 
-from subby import (BilibiliJSONConverter, CommonIssuesFixer, ISMTConverter,
-                   SAMIConverter, SDHStripper, SMPTEConverter, WebVTTConverter,
-                   WVTTConverter, __version__)
+# Converters and processors are imported inside commands, as their dependencies are slow to import
+from subby import __version__
+from subby.detect import detect_file
+
+if TYPE_CHECKING:
+    from subby import SubRipFile
 
 
 @click.group()
@@ -35,7 +41,7 @@ def version():
 
 @main.command()
 @click.argument("file", type=Path)
-@click.option("-o", "--out", type=Path, default=None, help="Output path.")
+@click.option("-o", "--out", type=Path, default=None, help="Output path (- for stdout).")
 @click.option(
     "-l",
     "--language",
@@ -82,50 +88,117 @@ def convert(
 
     log = logging.getLogger("convert")
 
-    data = file.read_bytes()
-    converter = None
-
-    if b"mdat" in data and b"moof" in data:
-        if b"</tt>" in data:
-            log.info("Subtitle format: ISMT (DFXP in MP4)")
-            converter = ISMTConverter()
-        elif b"vttc" in data:
-            log.info("Subtitle format: WVTT (WebVTT in MP4)")
-            converter = WVTTConverter()
-    elif b"<SAMI>" in data:
-        log.info("Subtitle format: SAMI")
-        converter = SAMIConverter()
-    elif b"</tt>" in data or b"</tt:tt>" in data:
-        log.info("Subtitle format: DFXP/TTML/TTML2")
-        converter = SMPTEConverter()
-    elif b"WEBVTT" in data:
-        log.info("Subtitle format: WebVTT")
-        converter = WebVTTConverter()
-    elif data.startswith(b'{') and b'"Stroke"' in data and b'"background_color"' in data:
-        log.info("Subtitle format: JSON (Bilibili)")
-        converter = BilibiliJSONConverter()
-
-    if not converter:
+    subtitle_format = detect_file(file)
+    if not subtitle_format:
         log.error("Subtitle format was unrecognized...")
         return
 
-    srt = converter.from_file(file)
+    log.info(f"Subtitle format: {subtitle_format.name}")
+    srt = subtitle_format.converter().from_file(file)
     log.info("Converted subtitle to SubRip (SRT)")
 
     if not no_post_processing:
-        processor = CommonIssuesFixer()
-        processor.remove_gaps = not keep_short_gaps
+        from subby import CommonIssuesFixer
+        processor = CommonIssuesFixer(inplace=True, remove_gaps=not keep_short_gaps)
         srt, status = processor.from_srt(srt, language=language)
         log.info(f"Processed subtitle {['but no issues were found...', 'and repaired some issues!'][status]}")
 
-    srt.save(out, encoding=encoding)
-    log.info(f"Saved to: {out}")
-    log.debug(f"Used character encoding {encoding}")
+    save(srt, out, encoding)
+
+
+@main.command()
+@click.argument("inputs", type=str)
+@click.option("-o", "--out", type=Path, default=None, help="Output directory (default: next to input files).")
+@click.option(
+    "-l",
+    "--language",
+    type=str,
+    default=None,
+    help="Subtitle language (used for language specific processing)"
+)
+@click.option(
+    "-e",
+    "--encoding",
+    type=str,
+    default="utf-8",
+    help="Character encoding (default: utf-8)."
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: number of CPUs)."
+)
+@click.option(
+    "-s",
+    "--strip-sdh",
+    is_flag=True,
+    default=False,
+    help="Also save a copy with SDH stripped (when any SDH descriptions were found)."
+)
+@click.option(
+    "-g",
+    "--keep-short-gaps",
+    is_flag=True,
+    help="Keep short gaps between lines (< 85 ms)"
+)
+def batch(
+    inputs: str,
+    out: Path | None,
+    language: str,
+    encoding: str,
+    workers: int | None,
+    strip_sdh: bool,
+    keep_short_gaps: bool
+):
+    """Convert and post-process Subtitles in a directory, or matching a glob pattern."""
+    from subby.batch import convert_files, detect_inputs, find_inputs
+
+    log = logging.getLogger("batch")
+
+    files, unrecognized = detect_inputs(find_inputs(inputs))
+    for file in unrecognized:
+        log.warning(f"Skipping {file}: subtitle format was unrecognized...")
+    if not files:
+        log.error("No subtitles found...")
+        return
+
+    if out:
+        out.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    converted = size = lines = 0
+    for result in convert_files(
+        files,
+        workers=workers,
+        out=out,
+        language=language,
+        encoding=encoding,
+        strip_sdh=strip_sdh,
+        keep_short_gaps=keep_short_gaps
+    ):
+        if result.error:
+            log.error(f"{result.file} ({result.format}): {result.error}")
+            continue
+        converted += 1
+        size += result.size
+        lines += result.lines
+        log.info(
+            f"{result.file} ({result.format}): {result.lines} lines in {result.duration * 1000:.0f} ms"
+            f" -> {', '.join(output.name for output in result.outputs)}"
+        )
+
+    elapsed = time.perf_counter() - start
+    log.info(
+        f"Converted {converted}/{len(files)} files ({lines} lines, {size / 1024 ** 2:.1f} MiB) in {elapsed:.2f} s"
+        f" - {converted / elapsed:.1f} files/s, {lines / elapsed:.0f} lines/s"
+    )
 
 
 @main.group()
 @click.argument("file", type=Path)
-@click.option("-o", "--out", type=Path, default=None, help="Output path.")
+@click.option("-o", "--out", type=Path, default=None, help="Output path (- for stdout).")
 @click.option(
     "-l",
     "--language",
@@ -153,6 +226,13 @@ def convert(
     is_flag=True,
     help="Keep short gaps between lines (< 85 ms)"
 )
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes fixing text of lines in large files (default: 1)."
+)
 def process(file: Path, out: Path | None, **__):
     """SubRip (SRT) post-processing."""
     if not isinstance(file, Path):
@@ -172,8 +252,11 @@ def mend(ctx: click.Context):
 
     log = logging.getLogger("process.mend")
 
-    processor = CommonIssuesFixer()
-    processor.remove_gaps = not ctx.parent.params["keep_short_gaps"]
+    from subby import CommonIssuesFixer
+    processor = CommonIssuesFixer(
+        workers=ctx.parent.params["workers"],
+        remove_gaps=not ctx.parent.params["keep_short_gaps"]
+    )
     processed_srt, status = processor.from_file(file, language=ctx.parent.params["language"])
     log.info(f"Processed subtitle {['but no issues were found...', 'and repaired some issues!'][status]}")
 
@@ -191,13 +274,17 @@ def strip_sdh(ctx: click.Context):
 
     log = logging.getLogger("process.strip_sdh")
 
+    from subby import CommonIssuesFixer, SDHStripper
     processor = SDHStripper()
     processed_srt, status = processor.from_file(file, language=ctx.parent.params["language"])
     log.info(f"Processed subtitle {['but no SDH descriptions were found...', 'and removed SDH!'][status]}")
 
     if not ctx.parent.params["no_post_processing"]:
-        processor = CommonIssuesFixer()
-        processor.remove_gaps = not ctx.parent.params["keep_short_gaps"]
+        processor = CommonIssuesFixer(
+            inplace=True,
+            workers=ctx.parent.params["workers"],
+            remove_gaps=not ctx.parent.params["keep_short_gaps"]
+        )
         processed_srt, _ = processor.from_srt(processed_srt, language=ctx.parent.params["language"])
         log.info(
             "Processed stripped subtitle "
@@ -212,6 +299,17 @@ def process_result(result, out, encoding, *_, **__):
     log = logging.getLogger("process")
     processed_srt, status = result
     if status:
-        processed_srt.save(out, encoding=encoding)
+        save(processed_srt, out, encoding)
+
+
+def save(srt: SubRipFile, out: Path, encoding: str):
+    """Saves subtitle to a given path, or writes it to stdout if path is "-"."""
+    log = logging.getLogger("save")
+    if str(out) == "-":
+        srt.write_to(sys.stdout.buffer, encoding=encoding)
+        sys.stdout.buffer.flush()
+        log.info("Written to stdout")
+    else:
+        srt.save(out, encoding=encoding)
         log.info(f"Saved to: {out}")
-        log.debug(f"Used character encoding {encoding}")
+    log.debug(f"Used character encoding {encoding}")
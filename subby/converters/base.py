@@ -1,27 +1,88 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from io import BytesIO
+from mmap import mmap
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Iterable, Iterator, Union
+
+from srt import Subtitle
 
 from subby.subripfile import SubRipFile
+from subby.utils.files import map_file
+from subby.utils.threads import map_in_threads
+
+# Buffers which converters can search (unlike memoryview), e.g. memory-mapped files
+BytesLike = Union[bytes, bytearray, mmap]
 
 
 class BaseConverter(ABC):
-    """Base subtitle converter class"""
+    """
+    Base subtitle converter class
+
+    Converters keep no state between (or during) conversions, so a single instance can be used from multiple threads
+    """
 
-    def from_file(self, file: Path) -> SubRipFile:
+    # Whether parsing needs all data at once, files are then memory-mapped instead of read
+    buffered_input = False
+
+    def from_file(self, file: Path, memory_map: bool = True) -> SubRipFile:
         """Reads a given file and converts it to srt"""
         with file.open(mode='rb') as stream:
-            return self.parse(stream)
+            if not (memory_map and self.buffered_input):
+                return self.parse(stream)
+            with map_file(stream) as data:
+                return self.parse_buffer(data)
 
     def from_string(self, data: str) -> SubRipFile:
         """Reads a given string and converts it to srt"""
-        return self.parse(BytesIO(data.encode('utf-8')))
+        return self.parse_string(data)
 
     def from_bytes(self, data: bytes) -> SubRipFile:
         """Parses given data and converts it to srt"""
         return self.parse(BytesIO(data))
 
+    def convert_many(
+        self,
+        inputs: Iterable[Union[Path, str, bytes]],
+        executor: Executor | None = None,
+        workers: int | None = None
+    ) -> list[SubRipFile]:
+        """
+        Converts given files (paths), strings or bytes to srt in a given executor (or a pool of `workers` threads)
+
+        Results are returned in order of inputs
+        """
+        return map_in_threads(self._convert_input, inputs, executor, workers)
+
+    def _convert_input(self, data: Union[Path, str, bytes]) -> SubRipFile:
+        if isinstance(data, Path):
+            return self.from_file(data)
+        if isinstance(data, str):
+            return self.from_string(data)
+        return self.from_bytes(data)
+
     @abstractmethod
     def parse(self, stream: BinaryIO) -> SubRipFile:
         """Parses data from a given stream and converts it to srt"""
+
+    def parse_buffer(self, data: BytesLike) -> SubRipFile:
+        """Parses data from a given bytes-like object (e.g. a memory-mapped file) and converts it to srt"""
+        return self.parse(BytesIO(data))
+
+    def parse_string(self, data: str) -> SubRipFile:
+        """
+        Parses given text and converts it to srt
+
+        Text based converters override this, so that text isn't encoded only to be decoded again
+        """
+        return self.parse(BytesIO(data.encode('utf-8')))
+
+    def iter_parse(self, stream: BinaryIO) -> Iterator[Subtitle]:
+        """
+        Parses data from a given stream, yielding srt lines as soon as they're converted
+
+        Converters which can't convert incrementally yield lines once the whole stream is parsed
+        """
+        yield from self.parse(stream)
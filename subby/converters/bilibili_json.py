@@ -11,7 +11,15 @@ class BilibiliJSONConverter(BaseConverter):
     """Bilibili JSON subtitle converter"""
 
     def parse(self, stream):
-        json_data = json.load(stream)
+        return self._convert(json.load(stream))
+
+    def parse_string(self, data):
+        # json.load accepts a BOM in binary data, but not in text
+        return self._convert(json.loads(data.removeprefix('\ufeff')))
+
+    @staticmethod
+    def _convert(json_data: dict) -> SubRipFile:
+        """Converts parsed JSON data to srt"""
         srt = SubRipFile()
         for i, line in enumerate(json_data['body']):
             if line['location'] != 2:
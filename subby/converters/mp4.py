@@ -15,32 +15,40 @@ from abc import ABC, abstractmethod
 class BaseSegmentedConverter(BaseConverter, ABC):
     """Segmented stream base converter"""
 
+    buffered_input = True
+
     def parse(self, stream):
+        return self.parse_buffer(stream.read())
+
+    def parse_buffer(self, data):
+        return self._parse(self._segments(data))
+
+    @staticmethod
+    def _segments(data):
+        """Yields segments found in given data, as views (so they aren't copied)"""
         ftyp_box_header = b"\x00\x00\x00\x1cftyp"
         styp_box_header = b"\x00\x00\x00\x18styp"
 
-        data = stream.read()
+        view = memoryview(data)
         first_segment_position = data.find(styp_box_header)
 
-        segments = []
-        if first_segment_position >= 0:
-            position = data.find(ftyp_box_header)
+        if first_segment_position < 0:
+            yield view
+            return
+
+        position = data.find(ftyp_box_header)
+        if position < 0:
+            # Init not found in segmented data - timescale is likely incorrect.
+            position = 0
+        previous_position = position
+        while True:
+            position = data.find(styp_box_header, position)
             if position < 0:
-                # Init not found in segmented data - timescale is likely incorrect.
-                position = 0
+                break
+            segment_length = position - previous_position
+            yield view[previous_position:position]
             previous_position = position
-            while True:
-                position = data.find(styp_box_header, position)
-                if position < 0:
-                    break
-                segment = data[previous_position:position]
-                segments.append(segment)
-                previous_position = position
-                position += len(segment)
-        else:
-            segments.append(data)
-
-        return self._parse(segments)
+            position += segment_length
 
     @abstractmethod
     def _parse(self, segments) -> SubRipFile:
@@ -50,8 +58,14 @@ class BaseSegmentedConverter(BaseConverter, ABC):
 class ISMTConverter(BaseSegmentedConverter):
     """ISMT (DFXP in MP4) subtitle converter"""
 
+    def iter_parse(self, stream):
+        yield from self._iter_lines(self._segments(stream.read()))
+
     def _parse(self, segments):
-        srt = SubRipFile([])
+        return SubRipFile(list(self._iter_lines(segments)))
+
+    def _iter_lines(self, segments):
+        last_line = None
 
         for segment in segments:
             for box in MP4.parse(segment):
@@ -60,12 +74,13 @@ class ISMTConverter(BaseSegmentedConverter):
 
                     # Offset timecodes if necessary
                     # https://github.com/SubtitleEdit/subtitleedit/blob/abd36e5/src/libse/SubtitleFormats/IsmtDfxp.cs#L85-L90
-                    if srt and new and srt[-1].start > new[0].start:
-                        new.offset(srt[-1].end)
+                    if last_line is not None and new and last_line.start > new[0].start:
+                        new.offset(last_line.end)
 
-                    srt.extend(new)
+                    if new:
+                        last_line = new[-1]
 
-        return srt
+                    yield from new
 
 
 class WVTTConverter(BaseSegmentedConverter):
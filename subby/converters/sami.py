@@ -10,11 +10,20 @@ from subby.utils.time import timedelta_from_ms
 class SAMIConverter(BaseConverter):
     """SAMI subtitle converter"""
 
+    buffered_input = True
+
     def parse(self, stream):
-        return _SAMIConverter(stream.read().decode('utf-8-sig')).srt
+        return self.parse_buffer(stream.read())
+
+    def parse_buffer(self, data):
+        return self.parse_string(str(data, 'utf-8-sig'))
+
+    def parse_string(self, data):
+        return _SAMIConverter(data.removeprefix('\ufeff')).srt
 
 
 # Internal converter class as we inherit from HTMLParser
+# (created for each file, so that converters can be shared between threads)
 class _SAMIConverter(HTMLParser):
     def __init__(self, subtitle):
         super().__init__()
@@ -1,56 +1,313 @@
+from __future__ import annotations
+
 import html
+import itertools
 import logging
 import re
+from io import BytesIO
+from typing import Mapping, NamedTuple
 
 import bs4
+from lxml import etree
 from srt import Subtitle
 
-from subby.converters.base import BaseConverter
+from subby.converters.base import BaseConverter, BytesLike
 from subby.subripfile import SubRipFile
 from subby.utils.time import timedelta_from_timestamp, timestamp_from_ms
 
+XML_ID = '{http://www.w3.org/XML/1998/namespace}id'
+# Parser errors which don't change the parsed document (undefined entities are left out, as with BeautifulSoup)
+TOLERATED_ERRORS = (etree.ErrorTypes.ERR_UNDECLARED_ENTITY, etree.ErrorTypes.DTD_ID_REDEFINED)
+# Strings of only these characters are replaced with a single space or line break by BeautifulSoup
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+# Byte order marks and whitespace preceding a document, which are left out when it's decoded
+LEADING_SPACES = re.compile(rb'(?:\xef\xbb\xbf){0,2}\s*')
+
 
 class SMPTEConverter(BaseConverter):
     """DFXP/TTML/TTML2 subtitle converter"""
 
+    buffered_input = True
+
     def parse(self, stream):
-        data = stream.read().decode('utf-8-sig')
+        return self.parse_buffer(stream.read())
+
+    def parse_buffer(self, data):
+        # Single documents are streamed from the buffer, without decoding all of it first
+        start = LEADING_SPACES.match(data).end()
+        if (end := data.find(b'</tt>', start)) >= 0 and data.find(b'</tt>', end + 1) < 0:
+            return _convert_document(data, start)
+        return self.parse_string(str(data, 'utf-8-sig'))
+
+    def parse_string(self, data):
+        data = data.removeprefix('\ufeff')
 
         if data.count('</tt>') == 1:
-            return _SMPTEConverter(data).srt
+            return _convert_document(data)
 
         # Support for multiple XML documents in a single file
         smpte_subs = [s + '</tt>' for s in data.strip().split('</tt>') if s]
         srt = SubRipFile([])
 
         for sub in smpte_subs:
-            srt.extend(_SMPTEConverter(sub).srt)
+            srt.extend(_convert_document(sub))
 
         return srt
 
 
-# Internal converter class as we need to handle multiple subs in one stream
-class _SMPTEConverter:
+def _convert_document(data: str | BytesLike, start: int = 0) -> SubRipFile:
+    """
+    Converts a single document (text, or UTF-8 data from a given position),
+    streaming it with lxml unless it needs BeautifulSoup for the same result
+    """
+    # XML declaration is only accepted at the very start, documents are parsed in recovery mode otherwise
+    # (which loses escaped characters)
+    if isinstance(data, str):
+        data = data.lstrip()
+    try:
+        return _SMPTEStreamConverter(data, start).srt
+    except (_Unsupported, etree.XMLSyntaxError):
+        if not isinstance(data, str):
+            data = str(data, 'utf-8-sig').removeprefix('\ufeff').lstrip()
+        return _SMPTEConverter(data).srt
+
+
+class _Unsupported(Exception):
+    """Document can't be streamed with the same result as with BeautifulSoup"""
+
+
+class _BufferReader:
+    """Reads data from a buffer (e.g. a memory-mapped file), copying only chunks which are read"""
+
+    def __init__(self, view: memoryview, position: int = 0):
+        self.view = view
+        self.position = position
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.view) if size < 0 else self.position + size
+        chunk = self.view[self.position:end].tobytes()
+        self.position += len(chunk)
+        return chunk
+
+
+class _Attributes(NamedTuple):
+    """Styling attributes of an element, as specified"""
+    style: str | None
+    font_style: str | None
+    display_align: str | None
+    ruby: str | None
+    region: str | None
+    # No attributes at all
+    bare: bool
+
+
+class _Style(NamedTuple):
+    """Computed style of an element"""
+    font_style: str | None = None
+    region: str | None = None
+    italic: bool = False
+    an8: bool = False
+    ruby: bool = False
+
+
+BARE = _Attributes(None, None, None, None, None, True)
+
+
+class _BaseSMPTEConverter:
+    """Timing and lines of a single document, shared by both engines"""
+
     def __init__(self, data):
         self.logger = logging.getLogger(__name__)
-        self.root = bs4.BeautifulSoup(data, 'lxml-xml')
-        # Unescape only if necessary (parsing fails)
-        if not self.root:
-            self.root = bs4.BeautifulSoup(html.unescape(data), 'lxml-xml')
-
         self.srt = SubRipFile([])
 
-        self.tickrate = int(self.root.tt.get('ttp:tickRate', 0))
+        self.tickrate = 0
         self.frame_duration = 1
-        if (rate := self.root.tt.get('ttp:frameRate')) is not None:
-            num, denom = map(int, self.root.tt.get('ttp:frameRateMultiplier', '1 1').split())
+
+        # Styles and regions by ID, resolved once they're used (all are parsed before converting lines)
+        self.styles: dict[str, _Attributes] = {}
+        self.regions: dict[str, tuple[_Attributes, list[_Attributes]]] = {}
+        self.resolved_styles: dict[str, dict[str, str]] = {}
+        self.resolved_regions: dict[str, dict[str, str]] = {}
+        # Computed styles by style of the parent element and attributes of an element
+        self.computed: dict[tuple[_Style, bool, _Attributes], _Style] = {}
+        italic_span = '<span tts:fontStyle="italic">'
+        # (`in` doesn't search memory-mapped files for subsequences)
+        self.all_span_italics = data.find(italic_span if isinstance(data, str) else italic_span.encode()) < 0
+
+    def _parse_rates(self, tickrate, rate, multiplier):
+        self.tickrate = int(tickrate)
+        if rate is not None:
+            num, denom = map(int, multiplier.split())
             framerate = (int(rate) * num) / denom
             self.frame_duration = (1 / framerate) * 1000  # ms
 
-        self.italics = {}
-        self.an8 = {}
-        self.ruby = {}
-        self.all_span_italics = '<span tts:fontStyle="italic">' not in data
+    def _add_style(self, style_id: str | None, attributes: _Attributes, region_id: str | None = None):
+        """Adds a style, which is nested in a region with a given ID (if any)"""
+        if style_id:
+            self.styles[style_id] = attributes
+        if region_id in self.regions:
+            self.regions[region_id][1].append(attributes)
+
+    def _add_region(self, region_id: str | None, attributes: _Attributes):
+        if region_id:
+            self.regions[region_id] = (attributes, [])
+
+    def _resolve_styles(self, references: str | None) -> dict[str, str]:
+        """Returns properties of referenced styles (later ones taking precedence)"""
+        properties = {}
+        for style_id in (references or '').split():
+            properties.update(self._resolve_style(style_id))
+        return properties
+
+    def _resolve_style(self, style_id: str, resolving: tuple[str, ...] = ()) -> dict[str, str]:
+        """Returns properties of a style, including ones of styles it references (chained referential styling)"""
+        if (properties := self.resolved_styles.get(style_id)) is not None:
+            return properties
+        if style_id not in self.styles or style_id in resolving:
+            return {}
+
+        attributes = self.styles[style_id]
+        properties = {}
+        for reference in (attributes.style or '').split():
+            properties.update(self._resolve_style(reference, resolving + (style_id,)))
+        properties.update(_properties(attributes))
+        self.resolved_styles[style_id] = properties
+        return properties
+
+    def _resolve_region(self, region_id: str) -> dict[str, str]:
+        """Returns properties of a region, from referenced styles, nested styles and its own attributes"""
+        if (properties := self.resolved_regions.get(region_id)) is None:
+            properties = self.resolved_regions[region_id] = {}
+            if region := self.regions.get(region_id):
+                attributes, nested = region
+                properties.update(self._resolve_styles(attributes.style))
+                for style in nested:
+                    properties.update(self._resolve_styles(style.style))
+                    properties.update(_properties(style))
+                properties.update(_properties(attributes))
+        return properties
+
+    def _compute_style(self, parent: _Style, name: str, attributes: _Attributes) -> _Style:
+        """Returns computed style of an element, given computed style of its parent"""
+        key = (parent, name == 'span', attributes)
+        if (style := self.computed.get(key)) is None:
+            style = self.computed[key] = self._new_style(parent, name == 'span', attributes)
+        return style
+
+    def _new_style(self, parent: _Style, span: bool, attributes: _Attributes) -> _Style:
+        properties = self._resolve_styles(attributes.style)
+        properties.update(_properties(attributes))
+        # Content inherits styles of the region it's in
+        region = attributes.region or parent.region
+        region_properties = self._resolve_region(region) if region else {}
+
+        if span and attributes.bare and self.all_span_italics:
+            # Spans without attributes toggle italics, unless italic spans are marked
+            italic = not parent.italic
+            font_style = 'italic' if italic else 'normal'
+        else:
+            font_style = properties.get('font_style', parent.font_style)
+            italic = (font_style or region_properties.get('font_style')) == 'italic'
+
+        display_align = properties.get('display_align') or region_properties.get('display_align')
+        return _Style(font_style, region, italic, display_align == 'before', properties.get('ruby') == 'text')
+
+    @staticmethod
+    def _style_text(text: str, style: _Style, parent: _Style) -> str:
+        """Marks text of an element with styles which are different from its parent's"""
+        if not text.strip():
+            return text
+
+        if style.italic and not parent.italic:
+            text = text.replace('<i>', '')
+            text = text.replace('</i>', '')
+            text = '<i>%s</i>' % text
+
+        if style.an8 and not parent.an8:
+            text = '{\\an8}%s' % text
+
+        if style.ruby:
+            text = '(%s)' % text
+
+        return text
+
+    def _parse_times(self, num: int, attributes: Mapping[str, str]) -> list[str] | None:
+        """Returns begin and end timestamps of a line, or None if they can't be parsed"""
+        times = []
+        try:
+            for time in ('begin', 'end'):
+                timestamp = attributes[time]
+                if timestamp.endswith('t'):
+                    times.append(self._convert_ticks(timestamp))
+                elif timestamp.endswith('ms'):
+                    times.append(timestamp_from_ms(timestamp[:-2]))
+                else:
+                    times.append(self._parse_timestamp(timestamp))
+        except (AttributeError, KeyError):
+            self._skip_line(time, num)
+            return None
+        return times
+
+    def _skip_line(self, time: str, num: int):
+        self.logger.warning(
+            'Could not parse %s timestamp for line %02d, skipping',
+            time, num
+        )
+
+    def _add_line(self, num: int, times: list[str], line_text: str, italic: bool, an8: bool):
+        srt_line = Subtitle(
+            index=num,
+            start=timedelta_from_timestamp(times[0]),
+            end=timedelta_from_timestamp(times[1]),
+            content=''
+        )
+
+        if italic and line_text.strip():
+            line_text = line_text.replace('<i>', '')
+            line_text = line_text.replace('</i>', '')
+            line_text = '<i>%s</i>' % line_text.strip()
+
+        if an8 and line_text.strip():
+            line_text = '{\\an8}%s' % line_text.strip()
+
+        srt_line.content = line_text.strip().strip('\n')
+        if srt_line.content:
+            self.srt.append(srt_line)
+
+    def _convert_ticks(self, ticks):
+        ticks = int(ticks[:-1])
+        offset = 1.0 / self.tickrate
+        seconds = (offset * ticks) * 1000
+
+        return timestamp_from_ms(seconds)
+
+    def _parse_timestamp(self, timestamp):
+        regex = r'([0-9]{2}):([0-9]{2}):([0-9]{2})[:\.,]?([0-9]{0,3})?'
+        parsed = re.search(regex, timestamp)
+        hours = int(parsed.group(1))
+        minutes = int(parsed.group(2))
+        seconds = int(parsed.group(3))
+        miliseconds = 0
+        if frames := parsed.group(4):
+            miliseconds = self.frame_duration * int(frames)
+
+        return "%02d:%02d:%02d.%03d" % (hours, minutes, seconds, miliseconds)
+
+
+# Internal converter class as we need to handle multiple subs in one stream
+# (created for each document, so that converters can be shared between threads)
+class _SMPTEConverter(_BaseSMPTEConverter):
+    def __init__(self, data):
+        super().__init__(data)
+        self.root = bs4.BeautifulSoup(data, 'lxml-xml')
+        # Unescape only if necessary (parsing fails)
+        if not self.root:
+            self.root = bs4.BeautifulSoup(html.unescape(data), 'lxml-xml')
+
+        tt = self.root.tt
+        self._parse_rates(
+            tt.get('ttp:tickRate', 0), tt.get('ttp:frameRate'), tt.get('ttp:frameRateMultiplier', '1 1')
+        )
 
         self._parse_styles()
         self._convert()
@@ -61,122 +318,272 @@ class _SMPTEConverter:
         except (AttributeError, AssertionError):
             return
 
-        for num, line in enumerate(self.root.tt.body.div.find_all('p'), 1):
-            line_text = ''
-
-            try:
-                for time in ('begin', 'end'):
-                    if line[time].endswith('t'):
-                        line[time] = self._convert_ticks(line[time])
-                    elif line[time].endswith('ms'):
-                        line[time] = timestamp_from_ms(line[time][:-2])
-                    else:
-                        line[time] = self._parse_timestamp(line[time])
-            except (AttributeError, KeyError):
-                self.logger.warning(
-                    'Could not parse %s timestamp for line %02d, skipping',
-                    time, num
-                )
+        body = self.root.tt.body
+        last_parent = style = None
+        for num, line in enumerate(body.div.find_all('p'), 1):
+            if (times := self._parse_times(num, line)) is None:
                 continue
 
-            srt_line = Subtitle(
-                index=num,
-                start=timedelta_from_timestamp(line['begin']),
-                end=timedelta_from_timestamp(line['end']),
-                content=''
-            )
+            # Style inherited from the body and divs containing the line, which is usually the same as for the last one
+            if line.parent is not last_parent:
+                last_parent, style = line.parent, _Style()
+                for ancestor in reversed([*itertools.takewhile(lambda parent: parent is not body, line.parents), body]):
+                    style = self._compute_style(style, ancestor.name, self._attributes(ancestor))
+            line_style = self._compute_style(style, line.name, self._attributes(line))
 
+            line_text = ''
             for element in line:
-                line_text += self._parse_element(element)
-
-            if self._is_italic(line) and line_text.strip():
-                line_text = line_text.replace('<i>', '')
-                line_text = line_text.replace('</i>', '')
-                line_text = '<i>%s</i>' % line_text.strip()
-
-            if self._is_an8(line) and line_text.strip():
-                line_text = '{\\an8}%s' % line_text.strip()
+                line_text += self._parse_element(element, line_style)
 
-            srt_line.content = line_text.strip().strip('\n')
-            if srt_line.content:
-                self.srt.append(srt_line)
+            self._add_line(num, times, line_text, line_style.italic, line_style.an8)
 
     def _parse_styles(self):
-        for style in self.root.find_all('style'):
-            if style.get('xml:id'):
-                self.italics[style['xml:id']] = self._is_italic(style)
-            if style.get('tts:ruby') == 'text':
-                self.ruby[style['xml:id']] = True
-        for region in self.root.find_all('region'):
-            if region.get('xml:id'):
-                self.an8[region['xml:id']] = self._is_an8(region)
-
-    def _parse_element(self, element):
+        for element in self.root.find_all(('style', 'region')):
+            if element.name == 'region':
+                self._add_region(element.get('xml:id'), self._attributes(element))
+            elif element.parent.name == 'region':
+                self._add_style(element.get('xml:id'), self._attributes(element), element.parent.get('xml:id'))
+            else:
+                self._add_style(element.get('xml:id'), self._attributes(element))
+
+    def _parse_element(self, element, parent_style):
         element_text = ''
         if isinstance(element, bs4.element.NavigableString):
             element_text += element
         elif isinstance(element, bs4.element.Tag):
-            subelement_text = ''
+            style = self._compute_style(parent_style, element.name, self._attributes(element))
             for subelement in element:
-                subelement_text += self._parse_element(subelement)
-            element_text += subelement_text
+                element_text += self._parse_element(subelement, style)
             if element.name == 'br':
                 element_text += '\n'
 
-            if self._is_italic(element) and element_text.strip():
-                element_text = element_text.replace('<i>', '')
-                element_text = element_text.replace('</i>', '')
-                element_text = '<i>%s</i>' % element_text
-
-            if self._is_an8(element) and element_text.strip():
-                element_text = '{\\an8}%s' % element_text
-
-            if self._is_ruby(element) and element_text.strip():
-                element_text = '(%s)' % element_text
+            element_text = self._style_text(element_text, style, parent_style)
 
         return element_text
 
-    def _is_italic(self, element):
-        if element.get('tts:fontStyle'):
-            return element.get('tts:fontStyle') == 'italic'
-        elif element.get('style'):
-            return self.italics.get(element['style'])
-        elif element.name == 'span' and not element.attrs and self.all_span_italics:
-            return not self._is_italic(element.parent)
-
-        return False
-
-    def _is_an8(self, element):
-        if element.get('tts:displayAlign'):
-            return element.get('tts:displayAlign') == 'before'
-        elif element.get('region'):
-            return self.an8.get(element['region'])
-
-        return False
+    @staticmethod
+    def _attributes(element):
+        if not (attributes := element.attrs):
+            return BARE
+        return _Attributes(
+            attributes.get('style'),
+            attributes.get('tts:fontStyle'),
+            attributes.get('tts:displayAlign'),
+            attributes.get('tts:ruby'),
+            attributes.get('region'),
+            False
+        )
+
+
+class _SMPTEStreamConverter(_BaseSMPTEConverter):
+    """
+    Converts a document with lxml's iterparse, converting each line (`<p>`) as soon as it's closed, and clearing it
+
+    Output is the same as with `_SMPTEConverter`, documents for which that can't be guaranteed
+    (malformed ones, namespaces declared below the root, or styles following lines) raise `_Unsupported`
+    """
+
+    def __init__(self, data, start=0):
+        super().__init__(data)
+        # Qualified names of prefixed attributes, resolved with prefixes declared on the root (same as BeautifulSoup)
+        self.namespaces = {}
+        self.font_style = self.display_align = self.ruby_style = None
+        # Element containing the last converted line, and its computed style
+        self.parent = self.parent_style = None
+        # Lines without valid timestamps, reported once it's certain that the document isn't converted again
+        self.skipped = []
+        try:
+            self._convert(data, start)
+        except (_Unsupported, etree.XMLSyntaxError):
+            # Document is converted again, reporting skipped lines the same way
+            self.skipped.clear()
+            raise
+        finally:
+            for time, num in self.skipped:
+                super()._skip_line(time, num)
+
+    def _convert(self, data, start):
+        if isinstance(data, str):
+            self._parse_stream(BytesIO(data.encode('utf-8')))
+            return
+        with memoryview(data) as view:
+            self._parse_stream(_BufferReader(view, start))
+
+    def _parse_stream(self, stream):
+        events = etree.iterparse(
+            stream,
+            events=('start', 'end', 'start-ns'),
+            encoding='utf-8',
+            recover=True
+        )
+        # Lines are taken from the first div of the first body of the first tt, as with BeautifulSoup
+        tt = body = div = line = None
+        in_tt = in_body = in_div = False
+        num = 0
+
+        for event, element in events:
+            if event == 'start-ns':
+                # Attributes in scope of namespaces declared below the root could be named differently,
+                # only new namespaces declared in the head (e.g. for metadata) are left as they are
+                prefix, uri = element
+                if tt is not None and (
+                    body is not None or (prefix or None) in self.namespaces or uri in self.namespaces.values()
+                ):
+                    raise _Unsupported('namespace declared below the root')
+                continue
 
-    def _is_ruby(self, element):
-        if element.get('tts:ruby') == 'text':
-            return True
-        elif element.get('style'):
-            return self.ruby.get(element['style'])
+            name = element.tag.rpartition('}')[2]
+            if event == 'end':
+                if element is line:
+                    num += 1
+                    self._convert_line(num, element, body)
+                    line = None
+                    # Converted lines aren't needed anymore
+                    element.clear(keep_tail=True)
+                    parent = element.getparent()
+                    while element.getprevious() is not None:
+                        del parent[0]
+                elif element is div:
+                    in_div = False
+                elif element is body:
+                    in_body = False
+                elif element is tt:
+                    in_tt = False
+                continue
 
-        return False
+            if name in ('style', 'region'):
+                # All styles are resolved before converting any lines
+                if tt is None or num or line is not None:
+                    raise _Unsupported(f'{name} outside of the head')
+                self._parse_style(element, name)
+            elif name == 'p' and in_div:
+                # Nested lines are converted before the line containing them, instead of after
+                if line is not None:
+                    raise _Unsupported('nested line')
+                line = element
+            elif tt is None:
+                if name == 'tt':
+                    tt, in_tt = element, True
+                    self._parse_root(element)
+            elif body is None:
+                if name == 'body' and in_tt:
+                    body, in_body = element, True
+            elif div is None and name == 'div' and in_body:
+                div, in_div = element, True
+
+        # Unrecoverable documents, and ones which could be recovered differently than by BeautifulSoup
+        if tt is None:
+            raise _Unsupported('no tt element')
+        for error in events.error_log:
+            if error.type not in TOLERATED_ERRORS:
+                raise _Unsupported(error.type_name)
+
+    def _parse_root(self, tt):
+        nsmap = self.namespaces = tt.nsmap
+        # BeautifulSoup names attributes with a single prefix for each namespace
+        if len(set(nsmap.values())) != len(nsmap):
+            raise _Unsupported('namespace with multiple prefixes')
+
+        def qualified(prefix, name):
+            return f'{{{nsmap[prefix]}}}{name}' if prefix in nsmap else None
+
+        self.font_style = qualified('tts', 'fontStyle')
+        self.display_align = qualified('tts', 'displayAlign')
+        self.ruby_style = qualified('tts', 'ruby')
+        self._parse_rates(
+            self._get(tt, qualified('ttp', 'tickRate')) or 0,
+            self._get(tt, qualified('ttp', 'frameRate')),
+            self._get(tt, qualified('ttp', 'frameRateMultiplier')) or '1 1'
+        )
+
+    def _parse_style(self, element, name):
+        if name == 'region':
+            self._add_region(element.get(XML_ID), self._attributes(element))
+            return
 
-    def _convert_ticks(self, ticks):
-        ticks = int(ticks[:-1])
-        offset = 1.0 / self.tickrate
-        seconds = (offset * ticks) * 1000
+        parent = element.getparent()
+        if parent is not None and parent.tag.rpartition('}')[2] == 'region':
+            self._add_style(element.get(XML_ID), self._attributes(element), parent.get(XML_ID))
+        else:
+            self._add_style(element.get(XML_ID), self._attributes(element))
 
-        return timestamp_from_ms(seconds)
+    def _skip_line(self, time, num):
+        self.skipped.append((time, num))
 
-    def _parse_timestamp(self, timestamp):
-        regex = r'([0-9]{2}):([0-9]{2}):([0-9]{2})[:\.,]?([0-9]{0,3})?'
-        parsed = re.search(regex, timestamp)
-        hours = int(parsed.group(1))
-        minutes = int(parsed.group(2))
-        seconds = int(parsed.group(3))
-        miliseconds = 0
-        if frames := parsed.group(4):
-            miliseconds = self.frame_duration * int(frames)
+    def _convert_line(self, num, line, body):
+        if (times := self._parse_times(num, line.attrib)) is None:
+            return
 
-        return "%02d:%02d:%02d.%03d" % (hours, minutes, seconds, miliseconds)
+        # Style inherited from the body and divs containing the line, which is usually the same as for the last one
+        if (parent := line.getparent()) is not self.parent:
+            self.parent, self.parent_style = parent, _Style()
+            ancestors = [body]
+            for ancestor in line.iterancestors():
+                if ancestor is body:
+                    break
+                ancestors.insert(1, ancestor)
+            for ancestor in ancestors:
+                self.parent_style = self._compute_style(
+                    self.parent_style, ancestor.tag.rpartition('}')[2], self._attributes(ancestor)
+                )
+        line_style = self._compute_style(self.parent_style, 'p', self._attributes(line))
+
+        line_text = self._parse_content(line, line_style)
+        self._add_line(num, times, line_text, line_style.italic, line_style.an8)
+
+    def _parse_content(self, element, style):
+        """Returns text of all content of an element, with strings as BeautifulSoup makes them (including comments)"""
+        parts = [] if element.text is None else [_collapse_spaces(element.text)]
+        for child in element:
+            if isinstance(child.tag, str):
+                parts.append(self._parse_element(child, style))
+            elif child.tag is etree.Comment:
+                parts.append(_collapse_spaces(child.text or ''))
+            elif child.tag is etree.PI:
+                parts.append(f'{child.target} {child.text or ""}')
+            else:
+                raise _Unsupported('entity reference')
+            if child.tail is not None:
+                parts.append(_collapse_spaces(child.tail))
+        return ''.join(parts)
+
+    def _parse_element(self, element, parent_style):
+        name = element.tag.rpartition('}')[2]
+        style = self._compute_style(parent_style, name, self._attributes(element))
+        element_text = self._parse_content(element, style)
+        if name == 'br':
+            element_text += '\n'
+
+        return self._style_text(element_text, style, parent_style)
+
+    def _attributes(self, element):
+        if not (attributes := dict(element.items())):
+            return BARE
+        # Names are None if their namespaces aren't declared
+        return _Attributes(
+            attributes.get('style'),
+            attributes.get(self.font_style),
+            attributes.get(self.display_align),
+            attributes.get(self.ruby_style),
+            attributes.get('region'),
+            False
+        )
+
+    @staticmethod
+    def _get(element, attribute):
+        return element.get(attribute) if attribute else None
+
+
+def _properties(attributes: _Attributes) -> dict[str, str]:
+    """Returns style properties specified with attributes"""
+    properties = {}
+    for name in ('font_style', 'display_align', 'ruby'):
+        if value := getattr(attributes, name):
+            properties[name] = value
+    return properties
+
+
+def _collapse_spaces(text: str) -> str:
+    if text.strip(ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import heapq
 import html
 import re
 from functools import partial
 from operator import attrgetter
+from io import StringIO
+from typing import Iterable, Iterator
 
 import tinycss
 from srt import Subtitle
@@ -25,20 +28,86 @@ class WebVTTConverter(BaseConverter):
     """WebVTT subtitle converter"""
 
     def parse(self, stream):
-        srt = SubRipFile()
+        return self._parse_lines(self._decode_lines(stream))
+
+    def parse_string(self, data):
+        # Split on line feeds only, as iterating over a binary stream does
+        return self._parse_lines(StringIO(data, newline='\n'))
+
+    def _parse_lines(self, lines: Iterable[str]) -> SubRipFile:
+        """Converts given lines of text to srt"""
+        styles = {}
+        srt = SubRipFile(list(self._iter_cues(lines, styles)))
+
+        # Sort lines with identical timecodes by position
+        # Some subtitles have them in an incorrect order, but display correctly due to positioning
+        srt.sort(key=attrgetter('start', 'end', 'proprietary'))
+
+        for line in srt:
+            self._format_cue(line, styles)
+
+        return srt
+
+    def iter_parse(self, stream, reorder_window: int = 0):
+        """
+        Parses data from a given stream, yielding lines as soon as they're complete
+
+        Lines are yielded in file order, unless `reorder_window` is set,
+        in which case up to `reorder_window` lines are buffered and sorted by position
+        (as `parse` does for the whole file)
+        """
+        styles = {}
+        buffer = []
+        index = 1
+
+        for num, line in enumerate(self._iter_cues(self._decode_lines(stream), styles)):
+            if not reorder_window:
+                line.index = index
+                index += 1
+                yield self._format_cue(line, styles)
+                continue
+
+            # Sequence number keeps the ordering stable for identical keys
+            heapq.heappush(buffer, (line.start, line.end, line.proprietary, num, line))
+            if len(buffer) > reorder_window:
+                line = heapq.heappop(buffer)[-1]
+                line.index = index
+                index += 1
+                yield self._format_cue(line, styles)
+
+        while buffer:
+            line = heapq.heappop(buffer)[-1]
+            line.index = index
+            index += 1
+            yield self._format_cue(line, styles)
+
+    @staticmethod
+    def _decode_lines(stream) -> Iterator[str]:
+        """Yields lines of text from a given binary stream"""
+        for line in stream:
+            yield line.decode('utf-8')
+
+    def _iter_cues(self, lines: Iterable[str], styles: dict[str, dict[str, str]]) -> Iterator[Subtitle]:
+        """
+        Yields unformatted lines from given lines of text, once their text is complete
+
+        Styles found in the stream are stored in `styles`,
+        position of each line is temporarily stored in its `proprietary` field
+        """
+        # Lines without text are only complete once the next text is found
+        pending = []
         looking_for_text = False
         looking_for_style = False
         text = []
         position = None
         line_number = 1
-        styles = {}
         current_style = []
 
         css_parser = tinycss.make_parser('page3')
 
-        for line in stream:
-            # As our stream is bytes we have to deal with line breaks here
-            line = line.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n').strip()
+        for line in lines:
+            # Lines are split on line feeds only, so we have to deal with other line breaks here
+            line = line.replace('\r\n', '\n').replace('\r', '\n').strip()
 
             # Skip processing any unnecessary lines
             if any(line.startswith(word) for word in SKIP_WORDS):
@@ -67,7 +136,9 @@ class WebVTTConverter(BaseConverter):
                 if not text:
                     continue
 
-                srt[-1].content = '\n'.join(text)
+                pending[-1].content = '\n'.join(text)
+                yield from pending
+                pending.clear()
                 text = []
                 looking_for_text = False
 
@@ -91,7 +162,7 @@ class WebVTTConverter(BaseConverter):
                 if end.count(':') == 1:
                     end = f'00:{end}'
 
-                srt.append(Subtitle(
+                pending.append(Subtitle(
                     index=line_number,
                     start=timedelta_from_timestamp(start),
                     end=timedelta_from_timestamp(end),
@@ -119,31 +190,30 @@ class WebVTTConverter(BaseConverter):
 
         # Add any leftover text to the last line
         if text:
-            srt[-1].content += '\n'.join(text)
+            pending[-1].content += '\n'.join(text)
 
-        # Sort lines with identical timecodes by position
-        # Some subtitles have them in an incorrect order, but display correctly due to positioning
-        srt.sort(key=attrgetter('start', 'end', 'proprietary'))
+        yield from pending
 
-        for line in srt:
-            line.proprietary = ''  # remove misused field
+    def _format_cue(self, line: Subtitle, styles: dict[str, dict[str, str]]) -> Subtitle:
+        """Converts formatting of a given line to srt"""
+        line.proprietary = ''  # remove misused field
 
-            # Replace styles with italics tag when appropriate
-            # (replace instead of match, to handle nested)
-            line.content = re.sub(
-                STYLE_TAG,
-                partial(self._replace_italics, styles=styles),
-                line.content
-            )
+        # Replace styles with italics tag when appropriate
+        # (replace instead of match, to handle nested)
+        line.content = re.sub(
+            STYLE_TAG,
+            partial(self._replace_italics, styles=styles),
+            line.content
+        )
 
-            # Add parentheses around ruby text
-            line.content = re.sub(RUBY_TEXT_TAG, r'(\1)', line.content)
-            line.content = re.sub(RUBY_PARENTHESIS_TAG, r'', line.content)
+        # Add parentheses around ruby text
+        line.content = re.sub(RUBY_TEXT_TAG, r'(\1)', line.content)
+        line.content = re.sub(RUBY_PARENTHESIS_TAG, r'', line.content)
 
-            # Strip non-italic tags
-            line.content = re.sub(HTML_TAG, '', line.content)
+        # Strip non-italic tags
+        line.content = re.sub(HTML_TAG, '', line.content)
 
-        return srt
+        return line
 
     @staticmethod
     def _get_position(cue_settings: list[str]) -> float | None:
@@ -0,0 +1,114 @@
+"""
+Subtitle format detection
+
+Each format registers a sniffer, which only looks at the beginning of data (up to `PREFIX_SIZE` bytes),
+so detection takes the same time regardless of file size.
+Converters are referenced by name and only imported once detected, as their dependencies are slow to import.
+"""
+from __future__ import annotations
+
+import importlib
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, NamedTuple, Union
+
+if TYPE_CHECKING:
+    from subby.converters.base import BaseConverter
+
+PREFIX_SIZE = 64 * 1024
+
+# Top level boxes an MP4 file or segment can start with
+MP4_BOX_TYPES = {b'ftyp', b'styp', b'moov', b'moof', b'sidx', b'emsg', b'free', b'mdat'}
+MP4_STPP = re.compile(rb'stpp|<(?:[\w.-]+:)?tt[\s>]')
+MP4_WVTT = re.compile(rb'wvtt|vttC|vttc|vtte')
+SAMI_ROOT = re.compile(rb'<SAMI[\s>]', re.IGNORECASE)
+TTML_ROOT = re.compile(rb'<(?:[\w.-]+:)?tt[\s>]')
+
+Sniffer = Callable[[bytes], bool]
+
+
+class Format(NamedTuple):
+    """Detectable subtitle format"""
+    name: str
+    # Converter class, or its name in the subby package
+    converter_class: Union[str, type]
+    sniffer: Sniffer
+
+    @property
+    def converter(self) -> type[BaseConverter]:
+        """Returns converter class for this format, importing it if necessary"""
+        if isinstance(self.converter_class, str):
+            return getattr(importlib.import_module('subby'), self.converter_class)
+        return self.converter_class
+
+
+FORMATS: list[Format] = []
+
+
+def register(name: str, converter: str | type, first: bool = False) -> Callable[[Sniffer], Sniffer]:
+    """
+    Registers decorated function as a sniffer for a given format
+
+    Sniffers are called with up to `PREFIX_SIZE` bytes from the beginning of data,
+    in order of registration (unless `first` is set, for formats which have to be checked before others)
+    """
+    def decorator(sniffer: Sniffer) -> Sniffer:
+        FORMATS.insert(0 if first else len(FORMATS), Format(name, converter, sniffer))
+        return sniffer
+    return decorator
+
+
+def detect_format(data: bytes) -> Format | None:
+    """Returns format of given data (bytes-like, e.g. a memory-mapped file), or None if unrecognized"""
+    prefix = bytes(data[:PREFIX_SIZE])
+    for subtitle_format in FORMATS:
+        if subtitle_format.sniffer(prefix):
+            return subtitle_format
+    return None
+
+
+def detect(data: bytes) -> type[BaseConverter] | None:
+    """Returns converter class for given data, or None if format is unrecognized"""
+    if subtitle_format := detect_format(data):
+        return subtitle_format.converter
+    return None
+
+
+def detect_file(file: Path) -> Format | None:
+    """Returns format of a given file, reading only its beginning"""
+    with file.open(mode='rb') as stream:
+        return detect_format(stream.read(PREFIX_SIZE))
+
+
+def _is_mp4(prefix: bytes) -> bool:
+    return prefix[4:8] in MP4_BOX_TYPES
+
+
+@register('ISMT (DFXP in MP4)', 'ISMTConverter')
+def _sniff_ismt(prefix: bytes) -> bool:
+    return _is_mp4(prefix) and MP4_STPP.search(prefix) is not None
+
+
+@register('WVTT (WebVTT in MP4)', 'WVTTConverter')
+def _sniff_wvtt(prefix: bytes) -> bool:
+    return _is_mp4(prefix) and MP4_WVTT.search(prefix) is not None
+
+
+@register('SAMI', 'SAMIConverter')
+def _sniff_sami(prefix: bytes) -> bool:
+    return SAMI_ROOT.search(prefix) is not None
+
+
+@register('DFXP/TTML/TTML2', 'SMPTEConverter')
+def _sniff_ttml(prefix: bytes) -> bool:
+    return TTML_ROOT.search(prefix) is not None
+
+
+@register('WebVTT', 'WebVTTConverter')
+def _sniff_webvtt(prefix: bytes) -> bool:
+    return b'WEBVTT' in prefix
+
+
+@register('JSON (Bilibili)', 'BilibiliJSONConverter')
+def _sniff_bilibili_json(prefix: bytes) -> bool:
+    return prefix.startswith(b'{') and b'"Stroke"' in prefix and b'"background_color"' in prefix
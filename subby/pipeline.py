@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Union
+
+from subby.converters.base import BaseConverter
+from subby.processors.base import BaseProcessor, FileStage, Stage, TextStage
+from subby.subripfile import CompactSubRipFile, SubRipFile
+
+# Consecutive text stages, run in a single pass over lines
+TextStages = tuple[Callable[[str], Union[str, None]], ...]
+
+
+class Pipeline(BaseProcessor):
+    """
+    Runs processors (optionally on output of a converter) as a single job
+
+    Result is the same as running processors one after another, but all of them work on a single compact copy,
+    with text stages of consecutive processors fused into a single pass over lines (fixing each unique text once).
+    Returned success is whether any of the processors made changes.
+    """
+
+    def __init__(
+        self,
+        *processors: BaseProcessor,
+        converter: BaseConverter | None = None,
+        inplace: bool = False
+    ):
+        super().__init__(inplace)
+        self.processors = list(processors)
+        self.converter = converter
+
+    def from_file(self, file: Path, language: str | None = None) -> tuple[SubRipFile, bool]:
+        """Converts given file (or reads it as srt, if there's no converter) and processes it"""
+        if self.converter is None:
+            return super().from_file(file, language)
+        return self._run(self.converter.from_file(file), language, copy=False)
+
+    def from_string(self, data: str, language: str | None = None) -> tuple[SubRipFile, bool]:
+        """Converts given string (or reads it as srt, if there's no converter) and processes it"""
+        if self.converter is None:
+            return self._run(SubRipFile.from_string(data), language, copy=False)
+        return self._run(self.converter.from_string(data), language, copy=False)
+
+    def process(self, srt, language=None):
+        return self._run(srt, language, copy=not self.inplace)
+
+    def stages(self, language=None):
+        return [stage for processor in self.processors for stage in processor.stages(language)]
+
+    def plan(self, language: str | None = None) -> list[FileStage | TextStages]:
+        """
+        Returns stages of all processors in the order they're run, with consecutive text stages grouped
+
+        Text stages which don't remove lines are moved ahead of preceding timing only stages,
+        so that they're run in the same pass as text stages before them
+        """
+        planned: list[FileStage | TextStages] = []
+        for stage in self.stages(language):
+            if isinstance(stage, FileStage):
+                planned.append(stage)
+                continue
+
+            position = len(planned)
+            if not stage.removes_lines:
+                while position and isinstance(planned[position - 1], FileStage) and planned[position - 1].timing_only:
+                    position -= 1
+            if position and not isinstance(planned[position - 1], FileStage):
+                planned[position - 1] += (stage.fix,)
+            else:
+                planned.insert(position, (stage.fix,))
+        return planned
+
+    def _run(self, srt: SubRipFile, language: str | None, copy: bool) -> tuple[SubRipFile, bool]:
+        # Stages can change lines which are dropped on export, so exported lines tell if the file changed
+        exported = srt.exported_lines()
+        compact = srt if not copy and isinstance(srt, CompactSubRipFile) else CompactSubRipFile(srt)
+        for stage in self.plan(language):
+            if isinstance(stage, FileStage):
+                compact, _ = stage.run(compact)
+            else:
+                compact, _ = run_text_stages(compact, stage)
+
+        changed = compact.exported_lines() != exported
+        if not isinstance(srt, CompactSubRipFile):
+            return compact.to_subripfile(), changed
+        return compact, changed
+
+
+def run_text_stages(srt: CompactSubRipFile, fixes: TextStages) -> tuple[CompactSubRipFile, bool]:
+    """Runs given text stages on each line, in a single pass, returns processed file and whether anything changed"""
+    contents = srt.contents
+    # Lines often repeat, and stages depend only on text
+    fixed_contents: dict[str, str | None] = {}
+    changed = removed = False
+    for position, content in enumerate(contents):
+        try:
+            fixed = fixed_contents[content]
+        except KeyError:
+            fixed = content
+            for fix in fixes:
+                if (fixed := fix(fixed)) is None:
+                    break
+            fixed_contents[content] = fixed
+
+        if fixed is None:
+            removed = True
+            # Removing a blank line doesn't change the file, as it wouldn't be exported
+            changed |= bool(content.strip())
+        elif fixed != content:
+            changed = True
+        contents[position] = fixed
+
+    if removed:
+        srt = srt.take(position for position, content in enumerate(contents) if content is not None)
+    return srt, changed
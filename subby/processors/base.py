@@ -1,13 +1,52 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Union
 
-from subby.subripfile import SubRipFile
+from subby.subripfile import CompactSubRipFile, SubRipFile
+from subby.utils.files import map_file
+from subby.utils.threads import map_in_threads
+
+
+class TextStage(NamedTuple):
+    """
+    Processing stage fixing text of each line on its own
+
+    `fix` returns fixed text, or None if the line should be removed (only allowed with `removes_lines` set)
+    """
+    fix: Callable[[str], Union[str, None]]
+    removes_lines: bool = False
+
+
+class FileStage(NamedTuple):
+    """
+    Processing stage working on the whole file, returning processed file and whether anything was changed
+
+    Stages which are `timing_only` don't depend on text of lines (or on lines being removed by earlier stages),
+    so text stages which don't remove lines can run before them
+    """
+    run: Callable[[CompactSubRipFile], tuple[CompactSubRipFile, bool]]
+    timing_only: bool = False
+
+
+Stage = Union[TextStage, FileStage]
 
 
 class BaseProcessor(ABC):
-    """Base subtitle processor class"""
+    """
+    Base subtitle processor class
+
+    With `inplace` set, given subtitles are processed directly instead of a copy (so they can't be used afterwards),
+    and whether any changes were made is tracked while processing, instead of comparing exported files.
+    Processors keep only their settings (and thread-safe caches) between runs, so a single instance can be used
+    from multiple threads.
+    """
+
+    def __init__(self, inplace: bool = False):
+        self.inplace = inplace
 
     def from_srt(self, srt: SubRipFile, language: str | None = None) -> tuple[SubRipFile, bool]:
         """Processes given SubRipFile"""
@@ -15,13 +54,47 @@ class BaseProcessor(ABC):
 
     def from_file(self, file: Path, language: str | None = None) -> tuple[SubRipFile, bool]:
         """Processes given srt file"""
-        with file.open(mode='r', encoding='utf-8') as stream:
-            return self.from_string(stream.read(), language)
+        # Decode a memory-mapped file directly, instead of reading it into a buffer first
+        with file.open(mode='rb') as stream, map_file(stream) as data:
+            text = str(data, 'utf-8')
+        if '\r' in text:
+            # Same line breaks as reading in text mode
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return self.from_string(text, language)
 
     def from_string(self, data: str, language: str | None = None) -> tuple[SubRipFile, bool]:
         """Processes given string with srt subtitles"""
         return self.process(SubRipFile.from_string(data), language)
 
+    def process_many(
+        self,
+        inputs: Iterable[Union[SubRipFile, Path, str]],
+        language: str | None = None,
+        executor: Executor | None = None,
+        workers: int | None = None
+    ) -> list[tuple[SubRipFile, bool]]:
+        """
+        Processes given SubRipFiles, srt files (paths) or strings in a given executor (or a pool of `workers` threads)
+
+        Results are returned in order of inputs
+        """
+        return map_in_threads(partial(self._process_input, language=language), inputs, executor, workers)
+
+    def _process_input(self, data: Union[SubRipFile, Path, str], language: str | None) -> tuple[SubRipFile, bool]:
+        if isinstance(data, Path):
+            return self.from_file(data, language)
+        if isinstance(data, str):
+            return self.from_string(data, language)
+        return self.from_srt(data, language)
+
+    def stages(self, language: str | None = None) -> list[Stage]:
+        """
+        Returns stages equivalent to `process`, used to run multiple processors in a `subby.pipeline.Pipeline`
+
+        By default, the whole processor is a single stage
+        """
+        return [FileStage(partial(self.process, language=language))]
+
     @abstractmethod
     def process(self, srt: SubRipFile, language: str | None = None) -> tuple[SubRipFile, bool]:
         """
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LineCache:
+    """
+    Bounded cache of processed lines, evicting least recently used ones
+
+    A single cache can be shared between processors, files and threads,
+    as processors include their settings in keys
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lines: OrderedDict[Hashable, str] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> str | None:
+        """Returns cached line for a given key, or None if not cached"""
+        with self._lock:
+            try:
+                line = self._lines[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._lines.move_to_end(key)
+            self.hits += 1
+            return line
+
+    def put(self, key: Hashable, line: str):
+        """Caches a line for a given key"""
+        with self._lock:
+            self._lines[key] = line
+            self._lines.move_to_end(key)
+            if len(self._lines) > self.maxsize:
+                self._lines.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Returns cache statistics"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._lines))
+
+    def clear(self):
+        """Removes all cached lines and resets statistics"""
+        with self._lock:
+            self._lines.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._lines)
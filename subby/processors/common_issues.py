@@ -1,295 +1,686 @@
-import copy
-import datetime
+from __future__ import annotations
+
 import html
+import logging
 import re
+import time
 import unicodedata
-from datetime import timedelta
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import compress, count, repeat
+from operator import sub
+from threading import Lock
+from typing import Callable, Iterable, NamedTuple
 
 import langcodes
 from ftfy import fix_encoding
+from ftfy.badness import is_bad
 
 from subby import regex as Regex
-from subby.processors.base import BaseProcessor
+from subby.processors.base import BaseProcessor, FileStage, TextStage
+from subby.processors.cache import LineCache
 from subby.processors.rtl import RTL_LANGUAGES, RTLFixer
-from subby.subripfile import SubRipFile
-from subby.utils.time import line_duration
+from subby.subripfile import CompactSubRipFile
+
+HOUR_MS = 3600000
+DAY_MS = 24 * HOUR_MS
+# Line fixes don't depend on language or settings, so cached lines are only keyed by content
+CACHE_NAMESPACE = 'CommonIssuesFixer'
+# Line fixes are run at most this many times, as some of them can introduce issues, e.g. double spaces
+FIX_LINE_PASSES = 2
+# Unique lines fixed by a worker process at a time, files with fewer than two chunks of them are fixed in this process
+WORKER_CHUNK_LINES = 2000
+
+
+class LineRule(NamedTuple):
+    """
+    Single line fix, replacing `pattern` matches with `replacement`
+
+    Rules without a pattern call `replacement` with the whole line instead.
+    Rules with guards are only run if the line contains any of them
+    (which has to be true whenever the rule would change the line), line is stripped regardless.
+    """
+    pattern: re.Pattern | None
+    replacement: str | Callable[[str], str]
+    strip: bool = False
+    guards: tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        return self.replacement.__name__ if self.pattern is None else self.pattern.pattern
+
+
+def _rule(
+    pattern: str,
+    replacement: str,
+    guards: tuple[str, ...] = (),
+    flags: int = 0,
+    strip: bool = False
+) -> LineRule:
+    return LineRule(re.compile(pattern, flags), replacement, strip, guards)
+
+
+class RuleStats:
+    """
+    Numbers of lines each line rule was skipped for (guards not found), applied to, and changed
+
+    Counts of each line are added at once, so stats can be shared between threads
+    """
+
+    def __init__(self):
+        self.skipped: Counter[LineRule] = Counter()
+        self.applied: Counter[LineRule] = Counter()
+        self.changed: Counter[LineRule] = Counter()
+        self._lock = Lock()
+
+    def add(self, skipped: Iterable[LineRule], applied: Iterable[LineRule], changed: Iterable[LineRule]):
+        """Counts rules skipped, applied and changing a single line"""
+        with self._lock:
+            self.skipped.update(skipped)
+            self.applied.update(applied)
+            self.changed.update(changed)
+
+    def report(self) -> list[tuple[str, int, int, int]]:
+        """Returns name, skipped, applied and changed counts of each rule"""
+        return [
+            (rule.name, self.skipped[rule], self.applied[rule], self.changed[rule])
+            for rule in LINE_RULES
+        ]
+
+
+OPENING_TAG = re.compile(r'^(?:{\\an8\})?<([a-z])>')
+CHARACTER_REPLACEMENTS = str.maketrans({
+    # Replace paragraph start (pilcrow) with a musical note
+    # (This is extremely unlikely to occur in any other context
+    # and there are samples with this in the wild)
+    '¶': '♪',
+    # Replace short hyphen with regular size
+    '‐': '-',
+    # Replace double note with single note
+    '♫': '♪',
+})
+
+
+def _replace_characters(line: str) -> str:
+    return line.translate(CHARACTER_REPLACEMENTS)
+
+
+def _fix_encoding(line: str) -> str:
+    """Fixes encoding issues using ftfy, skipping lines which don't look like mojibake"""
+    # Same check ftfy starts with, done here to avoid its overhead on clean lines
+    if line.isascii() or not is_bad(line):
+        return line
+    return fix_encoding(line)
+
+
+def _close_tag(line: str) -> str:
+    """Adds closing tag if the line lacks one"""
+    if (m := OPENING_TAG.match(line)) and (end := f'</{m[1]}>') not in line:
+        line += end
+    return line
+
+
+# Patterns for linear time equivalents of `(.*)` rules
+BRACKET_SPLIT = re.compile(r'(?=[^.][\]\)][A-Z][^.])')
+SENTENCE_SPLIT = re.compile(r'(?=[^\.\sA-Z][!\.;:?](?<!(?:Mr|Ms)\.)(?<!Mrs\.)[A-Z][^.])')
+NOTE_AFTER_ITALICS = re.compile(r'</i>\s*♪')
+
+
+def _split_at_last_matches(line: str, split: re.Pattern, before: str, between: str) -> str:
+    """
+    Splits a line in the same way as `(.*)(..)(..)` patterns, in time linear to its length
+
+    Such patterns split text of each line (following the previous split) once, after the last match of `split`,
+    adding `before` at the start of the text, and `between` at the split.
+    Searching with a greedy `.*` instead starts over from each match, taking quadratic time on long lines.
+    """
+    if split.search(line) is None:
+        return line
+
+    parts = []
+    copied = position = 0
+    while found := split.search(line, position):
+        start = found.start()
+        # Matches can start with the line break
+        line_start = max(position, line.rfind('\n', 0, start) + 1)
+        line_end = line.find('\n', start)
+        if line_end == -1:
+            line_end = len(line)
+
+        last = start
+        while (found := split.search(line, last + 1)) and found.start() <= line_end:
+            last = found.start()
+        parts += (line[copied:line_start], before, line[line_start:last + 2], between)
+        copied = last + 2
+        position = last + 4
+
+    parts.append(line[copied:])
+    return ''.join(parts)
+
+
+def _split_after_brackets(line: str) -> str:
+    return _split_at_last_matches(line, BRACKET_SPLIT, '', '\n')
+
+
+def _split_after_sentences(line: str) -> str:
+    return _split_at_last_matches(line, SENTENCE_SPLIT, '- ', '\n- ')
+
+
+def _move_notes_into_italics(line: str) -> str:
+    """Moves notes following italics into them ("♪ <i>text</i> ♪" -> "♪ <i>text ♪</i>"), like `(♪.*)</i>\\s*♪`"""
+    parts = []
+    copied = position = 0
+    while (start := line.find('♪', position)) != -1:
+        line_end = line.find('\n', start)
+        if line_end == -1:
+            line_end = len(line)
+        last = None
+        while (found := NOTE_AFTER_ITALICS.search(line, start + 1)) and found.start() < line_end:
+            last = found
+            start = found.start()
+        if last is None:
+            if found is None:
+                break
+            # Notes on lines before the next italics followed by a note can't match
+            position = line.rfind('\n', 0, found.start()) + 1
+            continue
+
+        parts += (line[copied:last.start()], ' ♪</i>')
+        copied = position = last.end()
+
+    parts.append(line[copied:])
+    return ''.join(parts)
+
+
+def _remove_spaces_in_brackets(line: str) -> str:
+    """Removes spaces inside brackets ("( TEXT )" -> "(TEXT)"), up to the last closing bracket of each line"""
+    parts = []
+    copied = position = 0
+    while (start := line.find('( ', position)) != -1:
+        line_end = line.find('\n', start)
+        if line_end == -1:
+            line_end = len(line)
+        if (end := line.rfind(' )', start + 2, line_end)) == -1:
+            # No closing bracket for any of the brackets left on this line
+            position = line_end + 1
+            continue
+
+        parts += (line[copied:start], '(', line[start + 2:end], ')')
+        copied = position = end + 2
+
+    parts.append(line[copied:])
+    return ''.join(parts)
+
+
+# Fixes applied to every line, in order
+LINE_RULES = [
+    # [GENERAL] - Affects other regexes
+    # Remove more than one space
+    _rule(r' {2,}', ' ', guards=('  ',)),
+    # Correct lines starting with space
+    _rule(r'^\s*', ''),
+    _rule(r'\n\s*', '\n', guards=('\n',)),
+    #
+    # [ENCODING FIXES, CHARACTER REPLACEMENTS]
+    # Fix various encoding issues in the source using ftfy
+    # e.g. â™ª -> ♪, protÃ©gÃ© -> protégé
+    LineRule(None, _fix_encoding),
+    LineRule(None, _replace_characters, guards=('¶', '‐', '♫')),
+    # Replace hashes, asterisks at the start of a line with a musical note
+    _rule(r'^((?:{\\an8})?(?:<i>)?)(- ?)?[#\*]{1,}(?=\s+)', r'\1\2♪', guards=('#', '*'), flags=re.M),
+    # Replace hashes, asterisks at the end of a line with a musical note
+    _rule(
+        r'(?<=\s)(?<![#\*])(?:[#\*]{1,3}|[#\*]{1,3})(?![0-9A-Z])(</i>$|$)', r'♪\1',
+        guards=('#', '*'), flags=re.M
+    ),
+    _rule(r'^[#\*]+$', r'♪', guards=('#', '*'), flags=re.M),
+    # Move notes into italics, if rest of the line is
+    _rule(r'♪ <i>(.*)', r'<i>♪ \1', guards=('♪ <i>',)),
+    LineRule(None, _move_notes_into_italics, guards=('♪',)),
+    # Replace some pound signs with notes (Binge...)
+    # (Matches only start/end of a line with a space
+    # to avoid false positives)
+    _rule(r'^£ ', r'♪ ', guards=('£ ',)),
+    _rule(r' £$', r' ♪', guards=(' £',)),
+    # Duplicated notes
+    _rule(r'♪{1,}', r'♪', guards=('♪♪',)),
+    # Add spaces between notes and text
+    _rule(r'^♪([A-Za-z])', r'♪ \1', guards=('♪',)),
+    _rule(r'([A-Za-z])♪', r'\1 ♪', guards=('♪',)),
+    # Replace \h (non-breaking space in ASS) with a regular space
+    # (result of ffmpeg extraction of mp4-embedded subtitles)
+    _rule(r'(\\h)+', ' ', guards=('\\h',), strip=True),
+    # Fix leftover amps (html unescape fixes those, but not when they're duped)
+    _rule(r'&(amp;){1,}', r'&', guards=('&amp;',)),
+    # Fix "it'`s" -> "it's"
+    _rule(r"'[`’]", r"'", guards=("'`", "'’")),
+
+    # [TAG STRIPPING AND CORRECTING]
+    #
+    # Replace ASS positioning tags with top only
+    _rule(r'(\{\\an[0-9]\}){1,}', r'{\\an8}', guards=('{\\an',)),
+    # Remove space after ASS positioning tags
+    _rule(r'(\{\\an[0-9]\}) +(?=[A-Za-z-])', r'{\\an8}', guards=('{\\an',)),
+    # Fix hanging tags
+    _rule(r'^(<[a-z]>)\n', r'\1', guards=('>\n',)),
+    _rule(r'</([a-z])>$\n<([a-z])>', r'\n', guards=('>\n<',), flags=re.M),
+    # Remove duplicated tags
+    _rule(r'(<[a-z]>){1,}', r'\1', guards=('><',)),
+    _rule(r'(</[a-z]>){1,}', r'\1', guards=('></',)),
+    # Remove an unnecessary space after italic tag open
+    _rule(r'^(<[a-z]>) {1,}', r'\1', guards=('> ',)),
+    _rule(r'^ {1,}', ''),
+    # Remove non-italic tags
+    _rule(r'</?(?!i>)[a-z]+>', '', guards=('<',)),
+    # Remove spaces between tags
+    _rule(r'(<[a-z]>|\{\\an8\}) (<[a-z]>|\{\\an8\})', r'\1\2', guards=('> ', '} ')),
+    # Move hanging opening tags onto separate lines
+    _rule(r'(<[a-z]>)\n', r'\n\1', guards=('>\n',)),
+    # Move hanging closing tags onto separate lines
+    _rule(r'\n(</[a-z]>)', r'\1\n', guards=('\n</',)),
+    # Move spaces outside italic tags
+    _rule(r'(<[a-z]>) ', r' \1', guards=('> ',)),
+    _rule(r' (</[a-z]>)', r'\1 ', guards=(' </',)),
+    # Remove needless spaces inside italic tags
+    _rule(r'^(<[a-z]>) ', r'\1', guards=('> ',)),
+    # Fix "</tag>space<tag>"
+    _rule(r'(?:</[a-z]>)(\s*)(?:<[a-z]>)', r'\1', guards=('</',), flags=re.M),
+    # Remove empty tags
+    _rule(r'<[a-z]>\s*</[a-z]>', r'', guards=('</',)),
+    # Move "{\an8}" to the rest of the text if it's on a new line
+    _rule(r'({\\an8\})\n', r'\1', guards=('{\\an8}\n',)),
+    # Add closing italics tag if the line lacks one
+    LineRule(None, _close_tag, guards=('<',)),
+
+    # [REFORMATTING]
+    #
+    # Remove spaces inside brackets ("( TEXT )" -> "(TEXT)")
+    LineRule(None, _remove_spaces_in_brackets, guards=('( ',)),
+    # Replace any leftover <br> tags with a proper line break
+    _rule(r'<br ?\/?>', '\n', guards=('<br',)),
+    # Remove empty lines
+    _rule(r'^\.?\s*$', '', flags=re.M),
+    _rule(r'^-?\s*$', '', flags=re.M),
+    _rule(r'^(</?i>|\{\\an8\})?\s*$', '', flags=re.M),
+    # Remove lines consisting only of a single character or digit
+    _rule(r'^\[A-Za-z0-9]$', '', guards=('[A-Za-z0-9]',)),
+    # Adds missing spaces after "...", commas, and tags
+    _rule(r'([a-z])(\.\.\.)([a-zA-Z][^.])', r'\1\2 \3', guards=('...',)),
+    _rule(r'(</[a-z]>)(\w)', r'\1 \2', guards=('</',)),
+    _rule(r'([a-z]),([a-zA-Z])', r'\1, \2', guards=(',',)),
+    _rule(r',\n([a-z]+[\.\?])\s*$', r', \1', guards=(',\n',)),
+    # Correct front and end elypses
+    _rule(rf'({Regex.FRONT_OPTIONAL_TAGS_WITH_HYPHEN})' r'\.{1,}', r'\1...', guards=('.',), flags=re.M),
+    # (starting only at the first dot, as starting at next ones would only match less of them)
+    _rule(r'(?<!\.)\.{2,}' rf'({Regex.TAGS})?' r'\s*$', r'...\1', guards=('..',), flags=re.M),
+    # Add space after frontal speaker hyphen
+    _rule(r"^(<i>|\{\\an8\})?-+(?='?[\w\"\[\(\<\{\.\$♪¿¡])", r'\1- ', guards=('-',), flags=re.M),
+    # Remove unnecessary space before "--"
+    _rule(r'\s*--(\s*)', r'--\1', guards=('--',), flags=re.M),
+    # Move notes inside tags (</i> ♪ -> </i>)
+    _rule(r'(</[a-z]>)(\s*♪{1,})$', r'\2\1', guards=('♪',), flags=re.M),
+    # Remove trailing spaces
+    _rule(r' +$', r'', guards=(' ',), flags=re.M, strip=True),
+
+    # [LINE SPLITS AND LINE BREAKS]
+    #
+    # Adds missing line splits (primarily present in Amazon subtitles)
+    # ("...]Text" -> "...]\nText", "...text.Text" -> "- ...text.\n- Text", at the last such place of each line)
+    LineRule(None, _split_after_brackets, guards=(']', ')')),
+    LineRule(None, _split_after_sentences, guards=('!', '.', ';', ':', '?')),
+    # Fix weird linebreaks (caused by stripping SDH or not)
+    _rule(r'(^<[a-z]>|\n<[a-z]>)(\w+)\n', r'\1\2 ', guards=('<',)),
+    # Add missing hyphens
+    _rule(r'^\s*(?!-)(.*)\n- ([A-Z][a-z]+)$', r'- \1\n- \2', guards=('\n- ',)),
+    # Remove linebreaks inside lines
+    _rule(r'\r\n{1,}', r'\r\n', guards=('\r\n\n',), strip=True),
+    _rule(r'\n{1,}', r'\n', guards=('\n\n',), strip=True),
+    # Remove duplicate spaces around italics
+    _rule(r' +</i> +', r'</i> ', guards=(' </i> ',), strip=True),
+    # Remove italics from hyphen, when content immediately following is not italics
+    _rule(r'<i>-</i>([^<]+)', r'-\1', guards=('<i>-</i>',), strip=True),
+]
+
+
+# Files which are ASCII can't contain mojibake, even after line fixes
+# (the only other character added by them is ♪, which ftfy doesn't consider)
+LINE_RULES_WITHOUT_ENCODING = [rule for rule in LINE_RULES if rule.replacement is not _fix_encoding]
+
+
+def fix_line(line: str, fix_encoding: bool = True, stats: RuleStats | None = None) -> str:
+    """
+    Applies all line fixes to a given line
+
+    Fixes are repeated while they change the line, up to `FIX_LINE_PASSES` times
+    """
+    rules = LINE_RULES if fix_encoding else LINE_RULES_WITHOUT_ENCODING
+    apply_rules = _apply_rules if stats is None else partial(_apply_rules_with_stats, stats=stats)
+    for _ in range(FIX_LINE_PASSES):
+        fixed = apply_rules(line, rules).strip()
+        if fixed == line:
+            break
+        line = fixed
+    return line
+
+
+def _apply_rules(line: str, rules: list[LineRule]) -> str:
+    for pattern, replacement, strip, guards in rules:
+        if guards:
+            for guard in guards:
+                if guard in line:
+                    break
+            else:
+                if strip:
+                    line = line.strip()
+                continue
+
+        line = replacement(line) if pattern is None else pattern.sub(replacement, line)
+        if strip:
+            line = line.strip()
+    return line
+
+
+def _apply_rules_with_stats(line: str, rules: list[LineRule], stats: RuleStats) -> str:
+    """Same as `_apply_rules`, counting rules which were skipped, applied and changed the line"""
+    skipped, applied, changed = [], [], []
+    for rule in rules:
+        pattern, replacement, strip, guards = rule
+        if guards and not any(guard in line for guard in guards):
+            skipped.append(rule)
+            if strip:
+                line = line.strip()
+            continue
+
+        applied.append(rule)
+        fixed = replacement(line) if pattern is None else pattern.sub(replacement, line)
+        if strip:
+            fixed = fixed.strip()
+        if fixed != line:
+            changed.append(rule)
+        line = fixed
+    stats.add(skipped, applied, changed)
+    return line
 
 
 class CommonIssuesFixer(BaseProcessor):
     """Processor fixing common issues found in subtitles"""
 
-    remove_gaps: bool = True
+    def __init__(
+        self,
+        cache: LineCache | None = None,
+        rule_stats: RuleStats | None = None,
+        inplace: bool = False,
+        line_budget: float | None = None,
+        workers: int | None = None,
+        remove_gaps: bool = True
+    ):
+        super().__init__(inplace)
+        # Whether short gaps between lines are removed (and lines continued after them combined)
+        self.remove_gaps = remove_gaps
+        # Optional cache of fixed lines, which can be shared with other processors
+        self.cache = cache
+        # Optional counts of skipped/applied line rules, for finding out which of them are worth optimizing
+        self.rule_stats = rule_stats
+        # Optional time limit (in seconds) for fixing text of a line, lines taking longer are reported as warnings
+        self.line_budget = line_budget
+        # Optional number of worker processes fixing text of lines in large files (used by `process` only),
+        # timing is fixed and lines are combined in this process afterwards, with the same result
+        self.workers = workers
+        self.logger = logging.getLogger(__name__)
 
     def process(self, srt, language=None):
         lang_code = langcodes.get(language).language if language else None
-        fixed = self._fix_time_codes(copy.deepcopy(srt))
-        corrected = self._correct_subtitles(fixed)
+        # Files processed in place are compared by exported lines, like copies are compared by export
+        exported = srt.exported_lines() if self.inplace else None
+        # Work on a compact copy, so that timing passes use integer miliseconds
+        # (compact files are only copied if they can't be processed in place)
+        compact = srt if self.inplace and isinstance(srt, CompactSubRipFile) else CompactSubRipFile(srt)
+        fixed, _ = self._fix_time_codes(compact)
+        corrected, _ = self._correct_subtitles(fixed)
 
         if lang_code in RTL_LANGUAGES:
-            corrected, _ = RTLFixer().process(corrected, language=language)
+            corrected, _ = RTLFixer(inplace=True).process(corrected, language=language)
 
         if lang_code == 'en':
-            corrected = self._normalize_unicode(corrected)
+            corrected, _ = self._normalize_unicode(corrected)
 
+        if not isinstance(srt, CompactSubRipFile):
+            corrected = corrected.to_subripfile()
+
+        if self.inplace:
+            return corrected, corrected.exported_lines() != exported
         return corrected, corrected != srt
 
-    def _normalize_unicode(self, srt: SubRipFile) -> SubRipFile:
+    def stages(self, language=None):
+        lang_code = langcodes.get(language).language if language else None
+        stages = [
+            FileStage(self._fix_time_codes, timing_only=True),
+            TextStage(self._fix_line_text),
+            FileStage(self._combine_lines),
+        ]
+        if lang_code in RTL_LANGUAGES:
+            stages += RTLFixer().stages(language)
+        if lang_code == 'en':
+            stages.append(TextStage(partial(unicodedata.normalize, 'NFKC')))
+        return stages
+
+    def _normalize_unicode(self, srt: CompactSubRipFile) -> tuple[CompactSubRipFile, bool]:
         """Normalizes Unicode characters"""
-        for line in srt:
-            line.content = unicodedata.normalize('NFKC', line.content)
-        return srt
-
-    def _correct_subtitles(self, srt: SubRipFile) -> SubRipFile:
-        def _fix_line(line):
-            # [GENERAL] - Affects other regexes
-            # Remove more than one space
-            line = re.sub(r' {2,}', ' ', line)
-            # Correct lines starting with space
-            line = re.sub(r'^\s*', '', line)
-            line = re.sub(r'\n\s*', '\n', line)
-            #
-            # [ENCODING FIXES, CHARACTER REPLACEMENTS]
-            # Fix various encoding issues in the source using ftfy
-            # e.g. â™ª -> ♪, protÃ©gÃ© -> protégé
-            line = fix_encoding(line)
-            # Replace paragraph start (pilcrow) with a musical note
-            # (This is extremely unlikely to occur in any other context
-            # and there are samples with this in the wild)
-            line = line.replace(r'¶', r'♪')
-            # Replace short hyphen with regular size
-            line = line.replace(r'‐', r'-')
-            # Replace double note with single note
-            line = line.replace(r'♫', r'♪')
-            # Replace hashes, asterisks at the start of a line with a musical note
-            line = re.sub(
-                r'^((?:{\\an8})?(?:<i>)?)(- ?)?[#\*]{1,}(?=\s+)',
-                r'\1\2♪',
-                line,
-                flags=re.M
-            )
-            # Replace hashes, asterisks at the end of a line with a musical note
-            line = re.sub(
-                r'(?<=\s)(?<![#\*])(?:[#\*]{1,3}|[#\*]{1,3})(?![0-9A-Z])(</i>$|$)',
-                r'♪\1',
-                line,
-                flags=re.M
-            )
-            line = re.sub(r'^[#\*]+$', r'♪', line, flags=re.M)
-            # Move notes into italics, if rest of the line is
-            line = re.sub(r'♪ <i>(.*)', r'<i>♪ \1', line)
-            line = re.sub(r'(♪.*)</i>\s*♪', r'\1 ♪</i>', line)
-            # Replace some pound signs with notes (Binge...)
-            # (Matches only start/end of a line with a space
-            # to avoid false positives)
-            line = re.sub(r'^£ ', r'♪ ', line)
-            line = re.sub(r' £$', r' ♪', line)
-            # Duplicated notes
-            line = re.sub(r'♪{1,}', r'♪', line)
-            # Add spaces between notes and text
-            line = re.sub(r'^♪([A-Za-z])', r'♪ \1', line)
-            line = re.sub(r'([A-Za-z])♪', r'\1 ♪', line)
-            # Replace \h (non-breaking space in ASS) with a regular space
-            # (result of ffmpeg extraction of mp4-embedded subtitles)
-            line = re.sub(r'(\\h)+', ' ', line).strip()
-            # Fix leftover amps (html unescape fixes those, but not when they're duped)
-            line = re.sub(r'&(amp;){1,}', r'&', line)
-            # Fix "it'`s" -> "it's"
-            line = re.sub(r"'[`’]", r"'", line)
-
-            # [TAG STRIPPING AND CORRECTING]
-            #
-            # Replace ASS positioning tags with top only
-            line = re.sub(r'(\{\\an[0-9]\}){1,}', r'{\\an8}', line)
-            # Remove space after ASS positioning tags
-            line = re.sub(r'(\{\\an[0-9]\}) +(?=[A-Za-z-])', r'{\\an8}', line)
-            # Fix hanging tags
-            line = re.sub(r'^(<[a-z]>)\n', r'\1', line)
-            line = re.sub(r'</([a-z])>$\n<([a-z])>', r'\n', line, flags=re.M)
-            # Remove duplicated tags
-            line = re.sub(r'(<[a-z]>){1,}', r'\1', line)
-            line = re.sub(r'(</[a-z]>){1,}', r'\1', line)
-            # Remove an unnecessary space after italic tag open
-            line = re.sub(r'^(<[a-z]>) {1,}', r'\1', line)
-            line = re.sub(r'^ {1,}', '', line)
-            # Remove non-italic tags
-            line = re.sub(r'</?(?!i>)[a-z]+>', '', line)
-            # Remove spaces between tags
-            line = re.sub(r'(<[a-z]>|\{\\an8\}) (<[a-z]>|\{\\an8\})', r'\1\2', line)
-            # Move hanging opening tags onto separate lines
-            line = re.sub(r'(<[a-z]>)\n', r'\n\1', line)
-            # Move hanging closing tags onto separate lines
-            line = re.sub(r'\n(</[a-z]>)', r'\1\n', line)
-            # Move spaces outside italic tags
-            line = re.sub(r'(<[a-z]>) ', r' \1', line)
-            line = re.sub(r' (</[a-z]>)', r'\1 ', line)
-            # Remove needless spaces inside italic tags
-            line = re.sub(r'^(<[a-z]>) ', r'\1', line)
-            # Fix "</tag>space<tag>"
-            line = re.sub(r'(?:</[a-z]>)(\s*)(?:<[a-z]>)', r'\1', line, flags=re.M)
-            # Remove empty tags
-            line = re.sub(r'<[a-z]>\s*</[a-z]>', r'', line)
-            # Move "{\an8}" to the rest of the text if it's on a new line
-            line = re.sub(r'({\\an8\})\n', r'\1', line)
-            # Add closing italics tag if the line lacks one
-            if (m := re.search(r'^(?:{\\an8\})?<([a-z])>', line)) \
-                    and (end := f'</{m[1]}>') not in line:
-                line += end
-
-            # [REFORMATTING]
-            #
-            # Remove spaces inside brackets ("( TEXT )" -> "(TEXT)")
-            line = re.sub(r'\( (.*) \)', r'(\1)', line)
-            # Replace any leftover <br> tags with a proper line break
-            line = re.sub(r'<br ?\/?>', '\n', line)
-            # Remove empty lines
-            line = re.sub(r'^\.?\s*$', '', line, flags=re.M)
-            line = re.sub(r'^-?\s*$', '', line, flags=re.M)
-            line = re.sub(r'^(</?i>|\{\\an8\})?\s*$', '', line, flags=re.M)
-            # Remove lines consisting only of a single character or digit
-            line = re.sub(r'^\[A-Za-z0-9]$', '', line)
-            # Adds missing spaces after "...", commas, and tags
-            line = re.sub(r'([a-z])(\.\.\.)([a-zA-Z][^.])', r'\1\2 \3', line)
-            line = re.sub(r'(</[a-z]>)(\w)', r'\1 \2', line)
-            line = re.sub(r'([a-z]),([a-zA-Z])', r'\1, \2', line)
-            line = re.sub(r',\n([a-z]+[\.\?])\s*$', r', \1', line)
-            # Correct front and end elypses
-            line = re.sub(
-                rf'({Regex.FRONT_OPTIONAL_TAGS_WITH_HYPHEN})' r'\.{1,}',
-                r'\1...',
-                line, flags=re.M
-            )
-            line = re.sub(r'\.{2,}' rf'({Regex.TAGS})?' r'\s*$', r'...\1', line, flags=re.M)
-            # Add space after frontal speaker hyphen
-            line = re.sub(r"^(<i>|\{\\an8\})?-+(?='?[\w\"\[\(\<\{\.\$♪¿¡])", r'\1- ', line, flags=re.M)
-            # Remove unnecessary space before "--"
-            line = re.sub(r'\s*--(\s*)', r'--\1', line, flags=re.M)
-            # Move notes inside tags (</i> ♪ -> </i>)
-            line = re.sub(r'(</[a-z]>)(\s*♪{1,})$', r'\2\1', line, flags=re.M)
-            # Remove trailing spaces
-            line = re.sub(r' +$', r'', line, flags=re.M).strip()
-
-            # [LINE SPLITS AND LINE BREAKS]
-            #
-            # Adds missing line splits (primarily present in Amazon subtitles)
-            line = re.sub(r'(.*)([^.][\]\)])([A-Z][^.])', r'\1\2\n\3', line)
-            line = re.sub(
-                r'(.*)([^\.\sA-Z][!\.;:?])(?<!(?:Mr|Ms)\.)(?<!Mrs\.)([A-Z][^.])',
-                r'- \1\2\n- \3',
-                line
-            )
-            # Fix weird linebreaks (caused by stripping SDH or not)
-            line = re.sub(r'(^<[a-z]>|\n<[a-z]>)(\w+)\n', r'\1\2 ', line)
-            # Add missing hyphens
-            line = re.sub(r'^\s*(?!-)(.*)\n- ([A-Z][a-z]+)$', r'- \1\n- \2', line)
-            # Remove linebreaks inside lines
-            line = re.sub(r'\r\n{1,}', r'\r\n', line).strip()
-            line = re.sub(r'\n{1,}', r'\n', line).strip()
-            # Remove duplicate spaces around italics
-            line = re.sub(r' +</i> +', r'</i> ', line).strip()
-            # Remove italics from hyphen, when content immediately following is not italics
-            line = re.sub(r'<i>-</i>([^<]+)', r'-\1', line).strip()
-
-            return line
-
-        for line in srt:
-            # Unescape html entities (twice, because yes, double encoding happens...)
-            for _ in range(2):
-                line.content = html.unescape(line.content)
+        contents = srt.contents
+        normalized = [unicodedata.normalize('NFKC', content) for content in contents]
+        changed = normalized != contents
+        srt.contents = normalized
+        return srt, changed
 
-            # Run fix_line twice, as some of the fixes can introduce issues, e.g. double spaces
-            for _ in range(2):
-                line.content = _fix_line(line.content)
-                line.content = line.content.strip()
+    def _correct_subtitles(self, srt: CompactSubRipFile) -> tuple[CompactSubRipFile, bool]:
+        """Fixes text of all lines, then combines them"""
+        contents = srt.contents
+        changed = False
+        # Encoding fixes are skipped entirely for ASCII files (without html entities, which could add other characters)
+        fix_encoding = not all(content.isascii() and '&' not in content for content in contents)
+        # Rule statistics are only collected in this process
+        if self.workers is not None and self.workers > 1 and self.rule_stats is None:
+            fix = self._fix_contents_in_workers(contents, fix_encoding).__getitem__
+        else:
+            fix = partial(self._fix_cached_content, fix_encoding=fix_encoding)
+        for position, content in enumerate(contents):
+            fixed = fix(content)
+            if fixed != content:
+                contents[position] = fixed
+                changed = True
+
+        combined, combine_changed = self._combine_lines(srt)
+        return combined, changed or combine_changed
+
+    def _fix_contents_in_workers(self, contents: list[str], fix_encoding: bool) -> dict[str, str]:
+        """Returns fixed text of each unique line, with lines which aren't cached fixed in chunks by worker processes"""
+        fixed_contents = {}
+        uncached = []
+        for content in dict.fromkeys(contents):
+            if self.cache is not None and (fixed := self.cache.get((CACHE_NAMESPACE, content))) is not None:
+                fixed_contents[content] = fixed
+            else:
+                uncached.append(content)
+
+        if len(uncached) < 2 * WORKER_CHUNK_LINES:
+            fixed = [self._fix_timed_content(content, fix_encoding) for content in uncached]
+        else:
+            chunks = [
+                uncached[start:start + WORKER_CHUNK_LINES] for start in range(0, len(uncached), WORKER_CHUNK_LINES)
+            ]
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                fixed = [
+                    line
+                    for chunk in executor.map(_fix_contents, chunks, repeat(fix_encoding), repeat(self.line_budget))
+                    for line in chunk
+                ]
+
+        for content, line in zip(uncached, fixed):
+            fixed_contents[content] = line
+            if self.cache is not None:
+                self.cache.put((CACHE_NAMESPACE, content), line)
+        return fixed_contents
+
+    def _fix_line_text(self, content: str) -> str:
+        """Fixes text of a single line, fixing encoding only if it isn't ASCII (or has html entities)"""
+        return self._fix_cached_content(content, not (content.isascii() and '&' not in content))
+
+    def _fix_cached_content(self, content: str, fix_encoding: bool) -> str:
+        if self.cache is None:
+            return self._fix_timed_content(content, fix_encoding)
+
+        key = (CACHE_NAMESPACE, content)
+        if (fixed := self.cache.get(key)) is None:
+            fixed = self._fix_timed_content(content, fix_encoding)
+            self.cache.put(key, fixed)
+        return fixed
+
+    def _fix_timed_content(self, content: str, fix_encoding: bool) -> str:
+        """Fixes text of a single line, reporting it if it takes longer than the line budget"""
+        if self.line_budget is None:
+            return self._fix_content(content, fix_encoding, self.rule_stats)
 
-            # Remove remaining linebreaks
-            line.content = line.content.strip('\n')
+        start = time.perf_counter()
+        fixed = self._fix_content(content, fix_encoding, self.rule_stats)
+        if (duration := time.perf_counter() - start) > self.line_budget:
+            self.logger.warning(
+                'Fixing a line of %d characters took %.3f seconds (over the budget of %s): %r',
+                len(content), duration, self.line_budget, content[:50]
+            )
+        return fixed
 
+    def _combine_lines(self, srt: CompactSubRipFile) -> tuple[CompactSubRipFile, bool]:
+        """Removes italics/an8 present on all lines, combines lines and removes gaps"""
+        changed = False
         # Remove italics/an8 if every line has them, as this is almost certainly a mistake
         # (using slices should be more performant than regex or startswith/endswith)
         if len(srt) > 10 \
                 and all(line.content[:3] == '<i>' and line.content[-4:] == '</i>' for line in srt):
             for line in srt:
                 line.content = line.content[3:-4]
+            changed = True
         # Using a higher threshold for an8, as it's entirely plausible for forced subs to be all an8
         # (all lines set to an8 to avoid hardsubs is a possible edge case, but much less likely)
         if len(srt) > 100 and all(line.content[:6] == r'{\an8}' for line in srt):
             for line in srt:
                 line.content = line.content[6:]
+            changed = True
 
-        combined = self._combine_timecodes(srt)
+        combined, combine_changed = self._combine_timecodes(srt)
+        changed |= combine_changed
         if self.remove_gaps:
-            return self._remove_gaps(combined)
+            gapless, gaps_changed = self._remove_gaps(combined)
+            return gapless, changed or gaps_changed
+
+        return combined, changed
+
+    @staticmethod
+    def _fix_content(content: str, fix_encoding: bool = True, stats: RuleStats | None = None) -> str:
+        """Fixes text of a single line"""
+        # Unescape html entities (twice, because yes, double encoding happens...)
+        if '&' in content:
+            for _ in range(2):
+                content = html.unescape(content)
+
+        content = fix_line(content, fix_encoding, stats)
 
-        return combined
+        # Remove remaining linebreaks
+        return content.strip('\n')
 
-    def _combine_timecodes(self, srt: SubRipFile) -> SubRipFile:
-        """Combines lines with timecodes and same content"""
-        subs_copy = SubRipFile([])
-        for line in srt:
-            if len(subs_copy) == 0:
-                subs_copy.append(line)
+    def _combine_timecodes(self, srt: CompactSubRipFile) -> tuple[CompactSubRipFile, bool]:
+        """
+        Combines lines with timecodes and same content
+
+        Empty lines are removed without being counted as a change, as they wouldn't be exported anyway
+        """
+        starts, ends, contents = srt.starts, srt.ends, srt.contents
+        kept = []
+        changed = False
+        for position in range(len(contents)):
+            if not kept:
+                kept.append(position)
                 continue
-            if line_duration(subs_copy[-1]) == line_duration(line) \
-                    and subs_copy[-1].start == line.start \
-                    and subs_copy[-1].end == line.end:
-                if subs_copy[-1].content != line.content:
-                    subs_copy[-1].content += '\n' + line.content.replace('{\\an8}', '')
+            last = kept[-1]
+            gap = starts[position] - ends[last]
+            if starts[last] == starts[position] and ends[last] == ends[position]:
+                if contents[last] != contents[position]:
+                    contents[last] += '\n' + contents[position].replace('{\\an8}', '')
+                changed = True
             # Merge lines with the same text within 10 ms
-            elif self._subtract_ts(line.start, subs_copy[-1].end) < 10 \
-                    and line.content == subs_copy[-1].content:
-                subs_copy[-1].end = line.end
+            elif gap < 10 and contents[position] == contents[last]:
+                ends[last] = ends[position]
+                changed = True
             # Merge lines with less than 2 frames of gap and same text
             # to avoid duplicating lines as we remove gaps later
-            elif 0 < self._subtract_ts(line.start, subs_copy[-1].end) <= 85 \
-                    and line.content.startswith(subs_copy[-1].content) \
+            elif 0 < gap <= 85 \
+                    and contents[position].startswith(contents[last]) \
                     and self.remove_gaps:
-                subs_copy[-1].end = line.end
-                subs_copy[-1].content = line.content
+                ends[last] = ends[position]
+                contents[last] = contents[position]
+                changed = True
             # Fix overlapping times
-            elif self._subtract_ts(line.start, subs_copy[-1].end) == 0:
-                subs_copy[-1].end -= timedelta(milliseconds=1)
-                subs_copy.append(line)
-            elif line.content.strip():
-                subs_copy.append(line)
+            elif gap == 0:
+                ends[last] -= 1
+                kept.append(position)
+                changed = True
+            elif contents[position].strip():
+                kept.append(position)
 
-        subs_copy = subs_copy or srt
-        subs_copy.clean_indexes()
-        return subs_copy
+        combined = srt.take(kept)
+        combined.clean_indexes()
+        return combined, changed
 
-    def _remove_gaps(self, srt: SubRipFile) -> SubRipFile:
+    def _remove_gaps(self, srt: CompactSubRipFile) -> tuple[CompactSubRipFile, bool]:
         """Remove short gaps between lines"""
-        subs_copy = SubRipFile([])
-        for line in srt:
-            if len(subs_copy) == 0:
-                subs_copy.append(line)
+        starts, ends, contents = srt.starts, srt.ends, srt.contents
+        if all(map(str.strip, contents)):
+            # Every line is kept (as is the case after combining lines), so each one is compared with the previous
+            # (original) one, and gaps can be found all at once
+            closed = [
+                position for position, gap in enumerate(map(sub, starts[1:], ends), 1)
+                if 1 < gap <= 85
+            ]
+            for position in closed:
+                ends[position - 1] = starts[position] - 1
+            srt.clean_indexes()
+            return srt, bool(closed)
+
+        kept = []
+        changed = False
+        for position in range(len(contents)):
+            if not kept:
+                kept.append(position)
                 continue
             # Remove 2-frame or smaller gaps (2 frames/83ms@24 is Netflix standard)
-            elif 1 < self._subtract_ts(line.start, subs_copy[-1].end) <= 85:
-                subs_copy[-1].end = line.start - timedelta(milliseconds=1)
-                subs_copy.append(line)
-            elif line.content.strip():
-                subs_copy.append(line)
+            elif 1 < starts[position] - ends[kept[-1]] <= 85:
+                ends[kept[-1]] = starts[position] - 1
+                kept.append(position)
+                changed = True
+            elif contents[position].strip():
+                kept.append(position)
 
-        subs_copy = subs_copy or srt
-        subs_copy.clean_indexes()
-        return subs_copy
+        gapless = srt.take(kept)
+        gapless.clean_indexes()
+        return gapless, changed
 
     @staticmethod
-    def _fix_time_codes(srt: SubRipFile) -> SubRipFile:
+    def _fix_time_codes(srt: CompactSubRipFile) -> tuple[CompactSubRipFile, bool]:
         """Fixes timecodes over 23:59, often present in live content"""
-        offset = 0
-        for line in srt:
-            hours, _ = divmod(line.start.seconds, 3600)
-            hours += line.start.days * 24
-
-            if not offset and hours > 23:
-                offset = hours
-            if offset:
-                line.start -= datetime.timedelta(hours=offset)
-                line.end -= datetime.timedelta(hours=offset)
-        return srt
+        starts, ends = srt.starts, srt.ends
+        # Lines from the first one starting after 23:59 are moved back by its full hours
+        first = next(compress(count(), map(DAY_MS.__le__, starts)), None)
+        if first is None:
+            return srt, False
 
-    @staticmethod
-    def _subtract_ts(ts1: datetime.timedelta, ts2: datetime.timedelta) -> int:
-        """Subtracts two timestamps and returns a difference as int of miliseconds"""
-        return round((ts1 - ts2).total_seconds() * 1000)
+        offset = starts[first] // HOUR_MS * HOUR_MS
+        starts[first:] = array('q', [start - offset for start in starts[first:]])
+        ends[first:] = array('q', [end - offset for end in ends[first:]])
+        return srt, True
+
+
+def _fix_contents(contents: list[str], fix_encoding: bool, line_budget: float | None) -> list[str]:
+    """Fixes text of given lines, in a worker process"""
+    fixer = CommonIssuesFixer(line_budget=line_budget)
+    return [fixer._fix_timed_content(content, fix_encoding) for content in contents]
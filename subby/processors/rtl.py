@@ -1,8 +1,9 @@
+import copy
 import logging
 
 import langcodes
 
-from subby.processors.base import BaseProcessor
+from subby.processors.base import BaseProcessor, TextStage
 
 RTL_LANGUAGES = ('ar', 'fa', 'he', 'ps', 'syc', 'ug', 'ur')
 RTL_CONTROL_CHARS = ('\u200e', '\u200f', '\u202a', '\u202b', '\u202c', '\u202d', '\u202e')
@@ -12,23 +13,40 @@ RTL_CHAR = '\u202b'
 class RTLFixer(BaseProcessor):
     """Processor fixing right-to-left language tagging"""
 
-    def __init__(self):
+    def __init__(self, inplace: bool = False):
+        super().__init__(inplace)
         self.logger = logging.getLogger(__name__)
 
     def process(self, srt, language=None):
-        if language and langcodes.get(language).language not in RTL_LANGUAGES:
-            self.logger.warning('RTL tagger running on an unexpected language (%s)', language)
+        self._check_language(language)
+        corrected = srt if self.inplace else copy.deepcopy(srt)
+        changed = self._correct_subtitles(corrected)
+        return corrected, changed
+
+    def _correct_subtitles(self, srt) -> bool:
+        """Tags lines as right-to-left, returns whether any line was changed"""
+        changed = False
+        for line in srt:
+            content = self._tag_line(line.content)
+            if content != line.content:
+                line.content = content
+                changed = True
 
-        corrected = self._correct_subtitles(srt)
-        return srt, corrected != srt
+        return changed
 
-    def _correct_subtitles(self, srt):
-        for line in srt:
-            # Remove previous RTL-related formatting
-            for char in RTL_CONTROL_CHARS:
-                line.content = line.content.replace(char, '')
+    def stages(self, language=None):
+        self._check_language(language)
+        return [TextStage(self._tag_line)]
+
+    def _check_language(self, language):
+        if language and langcodes.get(language).language not in RTL_LANGUAGES:
+            self.logger.warning('RTL tagger running on an unexpected language (%s)', language)
 
-            # Add RLM char at the start of every line
-            line.content = RTL_CHAR + line.content.replace("\n", f"\n{RTL_CHAR}")
+    @staticmethod
+    def _tag_line(content: str) -> str:
+        # Remove previous RTL-related formatting
+        for char in RTL_CONTROL_CHARS:
+            content = content.replace(char, '')
 
-        return srt
+        # Add RLM char at the start of every line
+        return RTL_CHAR + content.replace("\n", f"\n{RTL_CHAR}")
@@ -2,119 +2,217 @@ from __future__ import annotations
 
 import copy
 import re
+import time
 
 from subby import regex as Regex
-from subby.processors.base import BaseProcessor
-from subby.subripfile import SubRipFile
+from subby.processors.base import BaseProcessor, FileStage, TextStage
+from subby.processors.cache import LineCache
+from subby.processors.terms import term_remover
+
+# Lines without any of these can't contain descriptions, speaker names, notes or hyphens
+SDH_TRIGGERS = ('[', '(', ':', '♪', '>>', '-')
+
+TAGS = re.compile(Regex.TAGS)
+POSITION_TAGS = re.compile(Regex.POSITION_TAGS)
+# Patterns of each stage, with characters which lines need to contain to match them
+FULL_LINE_DESCRIPTIONS = (
+    (re.compile(Regex.FULL_LINE_DESCIRPTION_BRACKET, re.S), '['),
+    (re.compile(Regex.FULL_LINE_DESCIRPTION_PARENTHESES, re.S), '('),
+)
+NEW_LINE_DESCRIPTIONS = (
+    (re.compile(Regex.NEW_LINE_DESCRIPTION_BRACKET, re.M), '['),
+    (re.compile(Regex.NEW_LINE_DESCRIPTION_PARENTHESES, re.M), '('),
+)
+INLINE_DESCRIPTIONS = (
+    (re.compile(Regex.FRONT_DESCRIPTION_BRACKET, re.M), r'\1', '['),
+    (re.compile(Regex.FRONT_DESCRIPTION_PARENTHESES, re.M), r'\1', '('),
+    (re.compile(Regex.END_DESCRIPTION_BRACKET, re.M), '', '['),
+    (re.compile(Regex.END_DESCRIPTION_PARENTHESES, re.M), '', '('),
+)
+INLINE_DESCRIPTION = re.compile(Regex.INLINE_DESCRIPTION, re.M)
+SPEAKERS = (re.compile(Regex.SPEAKER_PARENTHESES, re.M), re.compile(Regex.SPEAKER, re.M))
+CC_SPEAKER_TAG = re.compile(r'(^|\n)(</?[a-z]>|\{\\an8\})?>> ')
+CC_SPEAKER_LINE = re.compile(r'(^|\n)(</?[a-z]>|\{\\an8\})?>>($|\n)')
+SPEAKER_HYPHEN = re.compile(r'^(<i>|\{\\an8\})?-\s*', re.M)
+FIRST_SPEAKER_HYPHEN = re.compile(r'^(<i>|\{\\an8\})?-\s*')
 
 
 class SDHStripper(BaseProcessor):
     """Processor removing hard-of-hearing descriptions from subtitles"""
 
-    def __init__(self, extra_regexes: list[str] | None = None):
+    def __init__(
+        self,
+        extra_regexes: list[str] | None = None,
+        cache: LineCache | None = None,
+        inplace: bool = False,
+        deadline: float | None = None,
+        extra_terms: list[str] | None = None
+    ):
+        super().__init__(inplace)
         self.extra_regexes = [
             re.compile(regex, re.MULTILINE)
             for regex in extra_regexes or []
         ]
+        # Literal terms (e.g. speaker names), removed in a single pass over each line regardless of their number
+        self.extra_terms = term_remover(tuple(extra_terms)) if extra_terms else None
+        # Optional cache of stripped lines, which can be shared with other processors
+        self.cache = cache
+        # Optional time limit (in seconds) for processing a file, checked between lines
+        self.deadline = deadline
 
     def process(self, srt, language=None):
-        stripped = [line for line in copy.deepcopy(srt)]
-        stripped = self._clean_full_line_descriptions(stripped)
-        stripped = self._clean_new_line_descriptions(stripped)
-        stripped = self._clean_inline_descriptions(stripped)
-        stripped = self._clean_speaker_names(stripped)
-        stripped = self._strip_cc_speaker_tags(stripped)
-        stripped = self._strip_notes(stripped)
-        stripped = self._remove_extra_hyphens(stripped)
-        stripped = self._run_extra_regexes(stripped)
-
-        stripped = SubRipFile([line for line in stripped if line.content])
+        lines = list(srt if self.inplace else copy.deepcopy(srt))
+        # Compared with lines exported afterwards, so stripping lines which clean_indexes drops doesn't count
+        exported = srt.exported_lines() if self.inplace else None
+        deadline = None if self.deadline is None else time.monotonic() + self.deadline
+        if self.cache is None:
+            stripped = self._strip(lines, deadline)
+        else:
+            stripped = self._strip_cached(lines, deadline)
+
+        stripped = [line for line in stripped if line.content]
+        stripped = type(srt)(stripped)
         stripped.clean_indexes()
 
+        if self.inplace:
+            return stripped, stripped.exported_lines() != exported
         return stripped, stripped != srt
 
-    def _clean_full_line_descriptions(self, srt):
-        """Removes full line descriptions"""
-        for line in srt:
-            text = self._strip_tags(line.content)
-            for regex in (Regex.FULL_LINE_DESCIRPTION_BRACKET, Regex.FULL_LINE_DESCIRPTION_PARENTHESES):
-                text = re.sub(regex, r'', text, flags=re.S).strip()
-
-            if not text:
-                continue
-
-            yield line
-
-    def _clean_new_line_descriptions(self, srt):
-        """Removes line descriptions taking up an entire line break"""
-        for line in srt:
-            position = re.match(Regex.POSITION_TAGS, line.content.strip())
-            for regex in (Regex.NEW_LINE_DESCRIPTION_BRACKET, Regex.NEW_LINE_DESCRIPTION_PARENTHESES):
-                line.content = re.sub(regex, r'', line.content, flags=re.M).strip()
-
-            # Restore position, if it has been removed with the description
-            if position and position[0] not in line.content:
-                line.content = position[0] + line.content
+    def stages(self, language=None):
+        if self.deadline is not None:
+            # Deadline applies to whole files
+            return super().stages(language)
+        # Removed lines are dropped along with ones left blank, which clean_indexes would remove
+        # (it isn't timing only, as it also drops lines which later stages leave blank)
+        return [TextStage(self._strip_line, removes_lines=True), FileStage(self._clean_indexes)]
+
+    def _strip_line(self, content: str) -> str | None:
+        """Strips a single line, returns None if it should be removed"""
+        if self.cache is None:
+            stripped = self._strip_content(content)
+        else:
+            key = (self._cache_namespace(), content)
+            if (stripped := self.cache.get(key)) is None:
+                stripped = self._strip_content(content)
+                self.cache.put(key, stripped)
+        return stripped if stripped.strip() else None
+
+    def _strip_content(self, content: str) -> str:
+        """
+        Strips text of a single line, lines removed entirely are left empty
+
+        Stages run one after another on the whole text, each only if the text contains characters its patterns need
+        """
+        if not any(trigger in content for trigger in SDH_TRIGGERS):
+            # Only whitespace is stripped (and lines left blank without tags are removed)
+            if not self._strip_tags(content).strip():
+                return ''
+            return self._run_extra_regexes(content.strip())
+
+        # Remove full line descriptions
+        text = self._strip_tags(content)
+        for regex, trigger in FULL_LINE_DESCRIPTIONS:
+            if trigger in text:
+                text = regex.sub('', text)
+            text = text.strip()
+        if not text:
+            return ''
+
+        # Remove descriptions taking up an entire line break
+        position = POSITION_TAGS.match(content.strip())
+        for regex, trigger in NEW_LINE_DESCRIPTIONS:
+            if trigger in content:
+                content = regex.sub('', content)
+            content = content.strip()
+        # Restore position, if it has been removed with the description
+        if position and position[0] not in content:
+            content = position[0] + content
+
+        # Remove inline descriptions
+        for regex, replacement, trigger in INLINE_DESCRIPTIONS:
+            if trigger in content:
+                content = regex.sub(replacement, content)
+        if '[' in content or '(' in content:
+            content = INLINE_DESCRIPTION.sub('', content)
+        content = content.strip()
+
+        # Remove speaker names, retaining frontal tags/hyphens
+        if ':' in content:
+            for regex in SPEAKERS:
+                content = regex.sub(r'\2\3', content).strip()
+
+        # Remove US closed caption-style speaker tags (">> " before text, and lines consisting only of ">>")
+        if '>>' in content:
+            content = CC_SPEAKER_TAG.sub(r'\1\2', content)
+            if CC_SPEAKER_LINE.match(content):
+                return ''
+
+        # Remove lines with just musical notes
+        if '♪' in content:
+            notes = ''.join(self._strip_tags(content).split())
+            if notes and not notes.strip('♪'):
+                return ''
+
+        # Remove speaker hyphens if there's only one line
+        if '-' in content and len(SPEAKER_HYPHEN.findall(content)) == 1:
+            content = FIRST_SPEAKER_HYPHEN.sub(r'\1', content.strip())
+
+        return self._run_extra_regexes(content)
+
+    def _cache_namespace(self) -> tuple[str, ...]:
+        # Stages work on each line separately, so result depends only on text and extra regexes
+        # (term removers are shared between processors with the same terms, so they can be keyed by identity)
+        return ('SDHStripper', *(regex.pattern for regex in self.extra_regexes), self.extra_terms)
 
-            yield line
-
-    def _clean_inline_descriptions(self, srt):
-        """Removes inline"""
-        for line in srt:
-            line.content = re.sub(Regex.FRONT_DESCRIPTION_BRACKET, r'\10', line.content, flags=re.M)
-            line.content = re.sub(Regex.FRONT_DESCRIPTION_PARENTHESES, r'\1', line.content, flags=re.M)
-            for regex in (
-                Regex.END_DESCRIPTION_BRACKET,
-                Regex.END_DESCRIPTION_PARENTHESES,
-                Regex.INLINE_DESCRIPTION
-            ):
-                line.content = re.sub(regex, r'', line.content, flags=re.M)
-            line.content = line.content.strip()
-            yield line
-
-    def _clean_speaker_names(self, srt):
-        """Removes speaker names"""
-        for line in srt:
-            # Retain frontal tags/hyphens
-            for regex in (Regex.SPEAKER_PARENTHESES, Regex.SPEAKER):
-                line.content = re.sub(regex, r'\2\3', line.content, flags=re.M).strip()
-            yield line
-
-    def _strip_cc_speaker_tags(self, srt):
-        """Removes US closed caption-style speaker tags (>>)"""
-        for line in srt:
-            # Remove ">> " before text
-            line.content = re.sub(r'(^|\n)(</?[a-z]>|\{\\an8\})?>> ', r'\1\2', line.content)
-            # Remove lines consisting only of ">>"
-            if re.match(r'(^|\n)(</?[a-z]>|\{\\an8\})?>>($|\n)', line.content):
-                continue
-            yield line
-
-    def _strip_notes(self, srt):
-        """Removes lines with just musical notes"""
+    @staticmethod
+    def _clean_indexes(srt):
+        srt.clean_indexes()
+        return srt, False
+
+    def _strip(self, srt, deadline: float | None = None):
+        """Strips all lines, lines which are left empty aren't yielded"""
+        if deadline is not None:
+            srt = self._check_deadline(srt, deadline)
         for line in srt:
-            if re.match(r'^♪+$', re.sub(r'\s*', r'', self._strip_tags(line.content).strip())):
-                continue
-
-            yield line
-
-    def _run_extra_regexes(self, srt):
-        """Runs extra regexes provided by user"""
+            if content := self._strip_content(line.content):
+                line.content = content
+                yield line
+
+    def _strip_cached(self, srt, deadline: float | None = None):
+        """Strips lines which aren't cached, lines which are left empty aren't yielded"""
+        if deadline is not None:
+            srt = self._check_deadline(srt, deadline)
+        namespace = self._cache_namespace()
+        stripped_contents = {}
         for line in srt:
-            for regex in self.extra_regexes:
-                line.content = re.sub(regex, r'', line.content)
-            yield line
-
-    def _remove_extra_hyphens(self, srt):
-        """Remove speaker hyphens if there's only one line"""
+            if (content := stripped_contents.get(line.content)) is None:
+                key = (namespace, line.content)
+                if (content := self.cache.get(key)) is None:
+                    content = self._strip_content(line.content)
+                    self.cache.put(key, content)
+                stripped_contents[line.content] = content
+
+            if content:
+                line.content = content
+                yield line
+
+    def _check_deadline(self, srt, deadline: float):
+        """Raises TimeoutError if the deadline passes before all lines are processed"""
         for line in srt:
-            splits = len(re.findall(r'^(<i>|\{\\an8\})?-\s*', line.content, flags=re.M))
-            if splits == 1:
-                line.content = re.sub(r'^(<i>|\{\\an8\})?-\s*', r'\1', line.content.strip())
-
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Stripping SDH took longer than {self.deadline} seconds')
             yield line
 
+    def _run_extra_regexes(self, content: str) -> str:
+        """Runs extra regexes provided by user, then removes extra terms"""
+        for regex in self.extra_regexes:
+            content = regex.sub('', content)
+        if self.extra_terms is not None:
+            content = self.extra_terms.remove(content)
+        return content
 
     @staticmethod
     def _strip_tags(text: str) -> str:
-        return re.sub(Regex.TAGS, r'', text)
+        if '<' not in text and '{' not in text:
+            return text
+        return TAGS.sub('', text)
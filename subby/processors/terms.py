@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections import deque
+from functools import lru_cache
+from typing import Iterable
+
+
+class TermRemover:
+    """
+    Removes literal terms from text in a single pass, regardless of the number of terms (Aho-Corasick automaton)
+
+    Matches are removed from left to right, preferring the longest term starting at the same position
+    (same as a regex alternation of all terms, ordered from the longest)
+    """
+    __slots__ = ('terms', '_goto', '_fail', '_lengths')
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = tuple(dict.fromkeys(term for term in terms if term))
+        # Trie of all terms, with lengths of terms ending in each state
+        goto: list[dict[str, int]] = [{}]
+        lengths: list[tuple[int, ...]] = [()]
+        for term in self.terms:
+            state = 0
+            for char in term:
+                if (next_state := goto[state].get(char)) is None:
+                    next_state = goto[state][char] = len(goto)
+                    goto.append({})
+                    lengths.append(())
+                state = next_state
+            lengths[state] = (len(term),)
+
+        # Failure links point to the state of the longest suffix which is also in the trie,
+        # terms ending in it also end in the state linking to it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                suffix = fail[state]
+                while suffix and char not in goto[suffix]:
+                    suffix = fail[suffix]
+                if state:
+                    fail[next_state] = goto[suffix].get(char, 0)
+                lengths[next_state] += lengths[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._lengths = lengths
+
+    def remove(self, text: str) -> str:
+        """Returns text with all terms removed"""
+        goto, fail, lengths = self._goto, self._fail, self._lengths
+        # Longest term starting at each position
+        matches: dict[int, int] = {}
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in lengths[state]:
+                if matches.get(end - length, 0) < length:
+                    matches[end - length] = length
+
+        if not matches:
+            return text
+        parts = []
+        copied = 0
+        for start in sorted(matches):
+            # Matches overlapping a removed one are skipped
+            if start >= copied:
+                parts.append(text[copied:start])
+                copied = start + matches[start]
+        parts.append(text[copied:])
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=16)
+def term_remover(terms: tuple[str, ...]) -> TermRemover:
+    """Returns a term remover for given terms, built once for each list of terms"""
+    return TermRemover(terms)
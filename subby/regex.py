@@ -1,22 +1,36 @@
 TAGS = r'[<{][/\\]?[a-z0-9.]+[}>]'
 POSITION_TAGS = r'^{\\an[0-9]}'
-FRONT_OPTIONAL_TAGS_WITH_HYPHEN = rf'^\s*({TAGS})?\s*(-)?\s*({TAGS})?\s*'
+FRONT_OPTIONAL_TAGS_WITH_HYPHEN = rf'^\s*(?:({TAGS})\s*)?(?:(-)\s*)?(?:({TAGS})\s*)?'
 TIME_LOOKAHEAD = r'(?![0-9]{2})'
 
-SPEAKER = rf'({FRONT_OPTIONAL_TAGS_WITH_HYPHEN})\s*(Mc[A-Z][a-zA-Z]+|[A-Z0-9\&\[\]\.#\' ]+\s*|[A-Z][a-z]+):{TIME_LOOKAHEAD} ?'
-SPEAKER_PARENTHESES = rf'({FRONT_OPTIONAL_TAGS_WITH_HYPHEN})\s*(?:[A-Z0-9\&\[\]\.#\' ]+\s*|[A-Z][a-z]+)(?: \([a-zA-Z ]+\)): ?'
+# Same as above, without whitespace following the last tag or hyphen
+SPEAKER_FRONT_TAGS_WITH_HYPHEN = rf'^(?:\s*({TAGS}))?(?:\s*(-))?(?:\s*({TAGS}))?'
+# Speaker names can contain spaces, so they start after all leading whitespace,
+# and whitespace following them has to start with another whitespace character
+# (names made up only of spaces are matched separately as whitespace containing a space)
+SPEAKER_NAME = r'[A-Z0-9\&\[\]\.#\'][A-Z0-9\&\[\]\.#\' ]*(?:[^\S ]\s*)?'
+SPACES_ONLY_NAME = r'[^\S ]*[ ]\s*'
+
+SPEAKER = rf'({SPEAKER_FRONT_TAGS_WITH_HYPHEN})(?:\s*(Mc[A-Z][a-zA-Z]+|{SPEAKER_NAME}|[A-Z][a-z]+)|{SPACES_ONLY_NAME}):{TIME_LOOKAHEAD} ?'
+SPEAKER_PARENTHESES = rf'({SPEAKER_FRONT_TAGS_WITH_HYPHEN})(?:\s*(?:{SPEAKER_NAME}|[A-Z][a-z]+)|{SPACES_ONLY_NAME})(?: \([a-zA-Z ]+\)): ?'
+
+# Matches starting with whitespace only need to be tried at the start of it (or a line break following a previous
+# match), as starting later in the same whitespace would only match less of it (in time proportional to its length)
+WHITESPACE_RUN_START = r'(?:(?<!\s)|(?=\n))'
 
 FRONT_NOTES = r'(?:♪+\s+)'
 BACK_NOTES = r'(?:\s+♪+)'
 
-DESCRIPTION_BRACKET = r'\[(?!bleep\])(?:[^\]]|\s)*\]'
-DESCRIPTION_PARENTHESES = r'\((?!bleep\))(?:[^\)]|\s)*\)'
+DESCRIPTION_BRACKET = r'\[(?!bleep\])[^\]]*\]'
+DESCRIPTION_PARENTHESES = r'\((?!bleep\))[^\)]*\)'
 FULL_LINE_DESCIRPTION_BRACKET = rf'^-?\s*{FRONT_NOTES}?\[[^\]]+\]{BACK_NOTES}?$'
 NEW_LINE_DESCRIPTION_BRACKET = rf'^(?:{TAGS})?-?\s*{FRONT_NOTES}?{DESCRIPTION_BRACKET}(?:{TAGS})?{BACK_NOTES}?$'
-FRONT_DESCRIPTION_BRACKET = rf'^(?:{SPEAKER}|{SPEAKER_PARENTHESES})?({FRONT_OPTIONAL_TAGS_WITH_HYPHEN}){DESCRIPTION_BRACKET}:?'
-END_DESCRIPTION_BRACKET = rf'\s*{DESCRIPTION_BRACKET}\s*$'
+FRONT_DESCRIPTION_BRACKET = rf'^({FRONT_OPTIONAL_TAGS_WITH_HYPHEN}){DESCRIPTION_BRACKET}:?'
+END_DESCRIPTION_BRACKET = rf'{WHITESPACE_RUN_START}\s*{DESCRIPTION_BRACKET}\s*$'
 FULL_LINE_DESCIRPTION_PARENTHESES = rf'^-?\s*{FRONT_NOTES}?\([^\)]+\){BACK_NOTES}?$'
 NEW_LINE_DESCRIPTION_PARENTHESES = rf'^(?:{TAGS})?-?\s*{FRONT_NOTES}?{DESCRIPTION_PARENTHESES}{BACK_NOTES}?(?:{TAGS})?$'
-FRONT_DESCRIPTION_PARENTHESES = rf'^({FRONT_OPTIONAL_TAGS_WITH_HYPHEN})(?:{SPEAKER}|{SPEAKER_PARENTHESES})?{DESCRIPTION_PARENTHESES}:?'
-END_DESCRIPTION_PARENTHESES = rf'\s*{DESCRIPTION_PARENTHESES}:?\s*$'
+# Speakers are only matched after the last line break of leading whitespace, as starting on previous lines
+# would only match the same text (and take time proportional to the number of blank lines for each of them)
+FRONT_DESCRIPTION_PARENTHESES = rf'^({FRONT_OPTIONAL_TAGS_WITH_HYPHEN})(?:^(?=[^\S\n]*\S)(?:{SPEAKER}|{SPEAKER_PARENTHESES}))?{DESCRIPTION_PARENTHESES}:?'
+END_DESCRIPTION_PARENTHESES = rf'{WHITESPACE_RUN_START}\s*{DESCRIPTION_PARENTHESES}:?\s*$'
 INLINE_DESCRIPTION = r'(?:<[a-z]+>)?[\[(](?!bleep[\]\)]?)[A-Za-z ]+[)\]](?:</[a-z]+>)?'
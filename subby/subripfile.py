@@ -1,11 +1,37 @@
 from __future__ import annotations
 
+import codecs
+import re
+from array import array
 from collections import UserList
 from datetime import timedelta
+from operator import lt
 from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
 
 import srt
 
+MILLISECOND = timedelta(milliseconds=1)
+# Number of characters formatted before encoding and writing them out
+WRITE_CHUNK_SIZE = 64 * 1024
+
+# Block header (index and timing line) in the usual layout, anything else is left to srt.SRT_REGEX
+BLOCK_HEADER = re.compile(
+    r'\s*(?:([0-9]+)[^\S\n]*\n)?'
+    r'([0-9]{2}):([0-9]{2}):([0-9]{2})[,.]([0-9]{3}) --> '
+    r'([0-9]{2}):([0-9]{2}):([0-9]{2})[,.]([0-9]{3})(?![0-9]) ?([^\r\n]*)\r?\n'
+)
+# Beginning of the next block, which has to follow a blank line ending content (as in srt.SRT_REGEX)
+NEXT_BLOCK = re.compile(r'(?:(?:{idx})\s*{eol})?{ts}|\Z'.format(
+    idx=srt.RGX_INDEX,
+    ts=srt.RGX_TIMESTAMP,
+    eol=srt.RGX_POSSIBLE_CRLF
+))
+# Content line which could be taken as an index of the next block
+INDEX_LIKE_LINE = re.compile(r'\n-?[0-9]')
+DIGITS = {f'{i:02d}': i for i in range(100)}
+DIGITS.update({f'{i:03d}': i for i in range(1000)})
+
 
 class SubRipFile(UserList):
     def __init__(self, data: list[srt.Subtitle] | None = None):
@@ -13,7 +39,7 @@ class SubRipFile(UserList):
 
     @classmethod
     def from_string(cls, source: str):
-        return cls(list(srt.parse(source, ignore_errors=True)))
+        return cls(list(parse_srt(source)))
 
     def clean_indexes(self):
         self.data = list(srt.sort_and_reindex(self.data))
@@ -32,14 +58,456 @@ class SubRipFile(UserList):
 
     def export(self, eol: str | None = None) -> str:
         """Exports subtitle as text"""
-        return srt.compose(self.data, eol=eol)
+        return ''.join(self._compose(eol))
 
     def save(self, path: Path, encoding: str = 'utf-8-sig', eol: str | None = None):
         """Exports subtitle as text"""
         with path.open(mode='wb') as fp:
-            fp.write(srt.compose(self.data, eol=eol).encode(encoding))
+            self.write_to(fp, encoding=encoding, eol=eol)
+
+    def write_to(self, stream: BinaryIO, encoding: str = 'utf-8-sig', eol: str | None = None):
+        """Writes subtitle as text to a binary stream, without formatting the whole file first"""
+        encoder = codecs.getincrementalencoder(encoding)()
+        chunk = []
+        chunk_length = 0
+        for block in self._compose(eol):
+            chunk.append(block)
+            chunk_length += len(block)
+            if chunk_length >= WRITE_CHUNK_SIZE:
+                stream.write(encoder.encode(''.join(chunk)))
+                chunk.clear()
+                chunk_length = 0
+        stream.write(encoder.encode(''.join(chunk), final=True))
+
+    def compact(self) -> CompactSubRipFile:
+        """Returns a copy of subtitle stored as a CompactSubRipFile"""
+        return CompactSubRipFile(self.data)
+
+    def exported_lines(self) -> list[tuple[int, int, str, str]]:
+        """Returns times (in miliseconds), proprietary data and content of lines as they're exported"""
+        return [
+            (line.start // MILLISECOND, line.end // MILLISECOND, line.proprietary, srt.make_legal_content(line.content))
+            for line in srt.sort_and_reindex(self.data)
+        ]
+
+    def _compose(self, eol: str | None = None) -> Iterator[str]:
+        """Yields srt blocks, sorted and reindexed like srt.compose does"""
+        for line in srt.sort_and_reindex(self.data):
+            yield line.to_srt(eol=eol)
 
     def __eq__(self, other):
         if not isinstance(other, SubRipFile):
             raise NotImplementedError
         return self.export(eol='\n') == other.export(eol='\n')
+
+
+class CompactSubRipFile(SubRipFile):
+    """
+    SubRipFile storing lines in columns, with times as integer miliseconds
+
+    Items are `Cue` views, which behave like `srt.Subtitle` and write changes back to the file.
+    Views refer to a position, so ones obtained before removing, inserting or sorting lines
+    will refer to a different line afterwards.
+    """
+
+    def __init__(self, data: Iterable[srt.Subtitle] | None = None):
+        self.indexes = array('q')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.contents: list[str] = []
+        self.proprietary: list[str] = []
+        super().__init__(data)
+
+    @property
+    def data(self) -> list[Cue]:
+        return [Cue(self, position) for position in range(len(self.contents))]
+
+    @data.setter
+    def data(self, lines: Iterable[srt.Subtitle]):
+        if isinstance(lines, CompactSubRipFile):
+            self.indexes = array('q', lines.indexes)
+            self.starts = array('q', lines.starts)
+            self.ends = array('q', lines.ends)
+            self.contents = lines.contents.copy()
+            self.proprietary = lines.proprietary.copy()
+            return
+
+        # Read all lines before replacing columns, as they can be views of this file
+        indexes, starts, ends, contents, proprietary = array('q'), array('q'), array('q'), [], []
+        for line in lines:
+            index, start_ms, end_ms, content, line_proprietary = _row(line)
+            indexes.append(index)
+            starts.append(start_ms)
+            ends.append(end_ms)
+            contents.append(content)
+            proprietary.append(line_proprietary)
+
+        self.indexes, self.starts, self.ends = indexes, starts, ends
+        self.contents, self.proprietary = contents, proprietary
+
+    def take(self, positions: Iterable[int]) -> CompactSubRipFile:
+        """Returns a new file with lines at given positions, in given order"""
+        positions = list(positions)
+        taken = CompactSubRipFile()
+        taken.indexes = array('q', map(self.indexes.__getitem__, positions))
+        taken.starts = array('q', map(self.starts.__getitem__, positions))
+        taken.ends = array('q', map(self.ends.__getitem__, positions))
+        taken.contents = list(map(self.contents.__getitem__, positions))
+        taken.proprietary = list(map(self.proprietary.__getitem__, positions))
+        return taken
+
+    def to_subripfile(self) -> SubRipFile:
+        """Returns a copy of subtitle stored as a regular SubRipFile"""
+        return SubRipFile([line.to_subtitle() for line in self])
+
+    def clean_indexes(self):
+        starts, ends, contents = self.starts, self.ends, self.contents
+        positions = self._sorted_positions()
+        # Same rules as srt.sort_and_reindex, lines are only filtered if any of them are invalid
+        if contents and not (min(starts) >= 0 and all(map(lt, starts, ends)) and all(map(str.strip, contents))):
+            positions = [
+                position for position in positions
+                if contents[position].strip() and 0 <= starts[position] < ends[position]
+            ]
+        # Lines which are already sorted and valid (usually the case after processing) aren't copied
+        if positions != list(range(len(contents))):
+            self.data = self.take(positions)
+        self.indexes = array('q', range(1, len(self.contents) + 1))
+
+    def sort(self, key=None, reverse=False):
+        if key is None:
+            positions = self._sorted_positions(reverse=reverse)
+        else:
+            views = self.data
+            positions = sorted(range(len(views)), key=lambda position: key(views[position]), reverse=reverse)
+
+        self.data = self.take(positions)
+        self.indexes = array('q', range(1, len(self.contents) + 1))
+
+    def offset(self, offset: timedelta):
+        offset_ms = offset // MILLISECOND
+        self.starts = array('q', [start + offset_ms for start in self.starts])
+        self.ends = array('q', [end + offset_ms for end in self.ends])
+
+    def compact(self) -> CompactSubRipFile:
+        return CompactSubRipFile(self)
+
+    def exported_lines(self) -> list[tuple[int, int, str, str]]:
+        starts, ends, contents, proprietary = self.starts, self.ends, self.contents, self.proprietary
+        return [
+            (starts[position], ends[position], proprietary[position], srt.make_legal_content(contents[position]))
+            for position in self._sorted_positions()
+            if contents[position].strip() and 0 <= starts[position] < ends[position]
+        ]
+
+    def _compose(self, eol: str | None = None) -> Iterator[str]:
+        """Yields srt blocks, sorted and reindexed like srt.compose does"""
+        starts, ends, contents = self.starts, self.ends, self.contents
+        index = 1
+        for position in self._sorted_positions():
+            if not contents[position].strip() or not 0 <= starts[position] < ends[position]:
+                continue
+            yield _compose_block(
+                index, starts[position], ends[position],
+                contents[position], self.proprietary[position], eol=eol
+            )
+            index += 1
+
+    def _sorted_positions(self, reverse: bool = False) -> list[int]:
+        """Returns positions of lines sorted by start, end and index (srt.Subtitle ordering)"""
+        starts = self.starts
+        # Lines are usually in order already, in which case starts alone decide it
+        if all(map(lt, starts, starts[1:])):
+            positions = list(range(len(starts)))
+            return positions[::-1] if reverse else positions
+
+        keys = list(zip(starts, self.ends, self.indexes))
+        return sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+
+    # List methods modifying data have to act on the columns
+    def append(self, item: srt.Subtitle):
+        self.insert(len(self.contents), item)
+
+    def extend(self, other: Iterable[srt.Subtitle]):
+        for item in other:
+            self.append(item)
+
+    def insert(self, i: int, item: srt.Subtitle):
+        index, start_ms, end_ms, content, proprietary = _row(item)
+        self.indexes.insert(i, index)
+        self.starts.insert(i, start_ms)
+        self.ends.insert(i, end_ms)
+        self.contents.insert(i, content)
+        self.proprietary.insert(i, proprietary)
+
+    def pop(self, i: int = -1) -> srt.Subtitle:
+        line = self[i].to_subtitle()
+        del self[i]
+        return line
+
+    def remove(self, item: srt.Subtitle):
+        del self[self.index(item)]
+
+    def clear(self):
+        self.data = []
+
+    def reverse(self):
+        self.data = self.take(reversed(range(len(self.contents))))
+
+    def __setitem__(self, i, item):
+        if isinstance(i, slice):
+            lines = self.data
+            lines[i] = [line.to_subtitle() if isinstance(line, Cue) else line for line in item]
+            self.data = [line.to_subtitle() if isinstance(line, Cue) else line for line in lines]
+            return
+        position = range(len(self.contents))[i]
+        (
+            self.indexes[position], self.starts[position], self.ends[position],
+            self.contents[position], self.proprietary[position]
+        ) = _row(item)
+
+    def __delitem__(self, i):
+        for column in (self.indexes, self.starts, self.ends, self.contents, self.proprietary):
+            del column[i]
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(range(len(self.contents))[i])
+        return Cue(self, range(len(self.contents))[i])
+
+    def __iter__(self):
+        for position in range(len(self.contents)):
+            yield Cue(self, position)
+
+    def __len__(self):
+        return len(self.contents)
+
+
+class Cue:
+    """View of a single line stored in a CompactSubRipFile, behaving like srt.Subtitle"""
+
+    __slots__ = ('_file', '_position')
+
+    def __init__(self, file: CompactSubRipFile, position: int):
+        self._file = file
+        self._position = position
+
+    @property
+    def index(self) -> int:
+        return self._file.indexes[self._position]
+
+    @index.setter
+    def index(self, value: int | None):
+        self._file.indexes[self._position] = value or 0
+
+    @property
+    def start_ms(self) -> int:
+        return self._file.starts[self._position]
+
+    @start_ms.setter
+    def start_ms(self, value: int):
+        self._file.starts[self._position] = value
+
+    @property
+    def end_ms(self) -> int:
+        return self._file.ends[self._position]
+
+    @end_ms.setter
+    def end_ms(self, value: int):
+        self._file.ends[self._position] = value
+
+    @property
+    def start(self) -> timedelta:
+        return timedelta(milliseconds=self._file.starts[self._position])
+
+    @start.setter
+    def start(self, value: timedelta):
+        self._file.starts[self._position] = value // MILLISECOND
+
+    @property
+    def end(self) -> timedelta:
+        return timedelta(milliseconds=self._file.ends[self._position])
+
+    @end.setter
+    def end(self, value: timedelta):
+        self._file.ends[self._position] = value // MILLISECOND
+
+    @property
+    def content(self) -> str:
+        return self._file.contents[self._position]
+
+    @content.setter
+    def content(self, value: str):
+        self._file.contents[self._position] = value
+
+    @property
+    def proprietary(self) -> str:
+        return self._file.proprietary[self._position]
+
+    @proprietary.setter
+    def proprietary(self, value: str):
+        self._file.proprietary[self._position] = value
+
+    def to_subtitle(self) -> srt.Subtitle:
+        """Returns line as a standalone srt.Subtitle"""
+        return srt.Subtitle(
+            index=self.index,
+            start=self.start,
+            end=self.end,
+            content=self.content,
+            proprietary=self.proprietary
+        )
+
+    def to_srt(self, strict: bool = True, eol: str | None = '\n') -> str:
+        return _compose_block(self.index, self.start_ms, self.end_ms, self.content, self.proprietary, strict, eol)
+
+    def __lt__(self, other):
+        _, start_ms, end_ms, _, _ = _row(other)
+        return (self.start_ms, self.end_ms, self.index) < (start_ms, end_ms, other.index or 0)
+
+    def __eq__(self, other):
+        if not isinstance(other, (Cue, srt.Subtitle)):
+            return NotImplemented
+        return (self.index, self.start, self.end, self.content, self.proprietary) \
+            == (other.index, other.start, other.end, other.content, other.proprietary)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f'Cue(index={self.index!r}, start={self.start!r}, end={self.end!r}, '
+            f'content={self.content!r}, proprietary={self.proprietary!r})'
+        )
+
+
+def parse_srt(source: str) -> Iterator[srt.Subtitle]:
+    """
+    Parses srt subtitles in a single pass, equivalent to srt.parse(source, ignore_errors=True)
+
+    Blocks in the usual layout are tokenized directly,
+    others (e.g. missing blank lines, unusual timestamps) are matched with srt's regex
+    """
+    length = len(source)
+    expected_start = 0
+    position = 0
+    digits = DIGITS
+    # Next blank line positions are kept between blocks, so a missing kind isn't searched for again
+    next_lf = next_crlf = 0
+
+    while position < length:
+        subtitle = None
+
+        if header := BLOCK_HEADER.match(source, position):
+            content_start = header.end()
+            # Content ends with the first blank line, unless followed by something other than a block
+            if 0 <= next_lf < content_start:
+                next_lf = source.find('\n\n', content_start)
+            if 0 <= next_crlf < content_start:
+                next_crlf = source.find('\n\r\n', content_start)
+            blank_line = next_lf
+            if blank_line < 0 or 0 <= next_crlf < blank_line:
+                blank_line = next_crlf
+
+            if blank_line > content_start and source[content_start] not in '\r\n':
+                content_end = blank_line - 1 if source[blank_line - 1] == '\r' else blank_line
+                block_end = blank_line + (2 if source[blank_line + 1] == '\n' else 3)
+            else:
+                content_end = block_end = -1
+
+            if content_end > content_start \
+                    and not INDEX_LIKE_LINE.search(source, content_start, blank_line) \
+                    and NEXT_BLOCK.match(source, block_end):
+                index, h1, m1, s1, ms1, h2, m2, s2, ms2, proprietary = header.groups()
+                subtitle = srt.Subtitle(
+                    index=int(index) if index else None,
+                    start=MILLISECOND * (
+                        digits[h1] * 3600000 + digits[m1] * 60000 + digits[s1] * 1000 + digits[ms1]
+                    ),
+                    end=MILLISECOND * (
+                        digits[h2] * 3600000 + digits[m2] * 60000 + digits[s2] * 1000 + digits[ms2]
+                    ),
+                    content=source[content_start:content_end].replace('\r\n', '\n'),
+                    proprietary=proprietary
+                )
+                position = block_end
+
+        if subtitle is None:
+            # Unusual block, continue like srt.parse would
+            match = srt.SRT_REGEX.search(source, position)
+            if not match:
+                break
+            _check_contiguity(source, expected_start, match.start())
+            subtitle = _subtitle_from_match(match)
+            position = match.end()
+
+        yield subtitle
+        expected_start = position
+
+    _check_contiguity(source, expected_start, length)
+
+
+def _subtitle_from_match(match: re.Match) -> srt.Subtitle:
+    """Returns a subtitle from srt.SRT_REGEX match, the same way as srt.parse"""
+    raw_index, raw_start, raw_end, proprietary, content = match.groups()
+    if raw_index is not None:
+        raw_index = int(raw_index.split('.')[0])
+    return srt.Subtitle(
+        index=raw_index,
+        start=srt.srt_timestamp_to_timedelta(raw_start),
+        end=srt.srt_timestamp_to_timedelta(raw_end),
+        content=content.replace('\r\n', '\n'),
+        proprietary=proprietary
+    )
+
+
+def _check_contiguity(source: str, expected_start: int, actual_start: int):
+    """Logs skipped data, the same way as srt.parse(ignore_errors=True)"""
+    if expected_start == actual_start:
+        return
+    unmatched_content = source[expected_start:actual_start]
+    if expected_start == 0 and (unmatched_content.isspace() or unmatched_content == '\ufeff'):
+        return
+    srt.LOG.warning('Skipped unparseable SRT data: %r', unmatched_content)
+
+
+def _row(line: srt.Subtitle) -> tuple[int, int, int, str, str]:
+    """Returns column values of a given line"""
+    if isinstance(line, Cue):
+        return line.index, line.start_ms, line.end_ms, line.content, line.proprietary
+    return line.index or 0, line.start // MILLISECOND, line.end // MILLISECOND, line.content, line.proprietary
+
+
+def _srt_timestamp(ms: int) -> str:
+    """Returns an srt timestamp from miliseconds"""
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return '%02d:%02d:%02d,%03d' % (hours, minutes, seconds, ms)
+
+
+def _compose_block(
+    index: int,
+    start_ms: int,
+    end_ms: int,
+    content: str,
+    proprietary: str,
+    strict: bool = True,
+    eol: str | None = None
+) -> str:
+    """Returns an srt block, formatted the same way as srt.Subtitle.to_srt"""
+    if proprietary:
+        proprietary = ' ' + proprietary
+    if strict:
+        content = srt.make_legal_content(content)
+    if eol is None:
+        eol = '\n'
+    elif eol != '\n':
+        content = content.replace('\n', eol)
+    return (
+        f'{index or 0}{eol}{_srt_timestamp(start_ms)} --> {_srt_timestamp(end_ms)}{proprietary}{eol}'
+        f'{content}{eol}{eol}'
+    )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import io
+import mmap
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+
+@contextmanager
+def map_file(stream: BinaryIO) -> Iterator[mmap.mmap | bytes]:
+    """
+    Memory-maps a given file for reading, so its data isn't copied into memory
+
+    Files which can't be mapped (e.g. empty files, pipes) are read instead
+    """
+    try:
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        yield stream.read()
+        return
+
+    try:
+        yield mapped
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            # Views of the data are still referenced (e.g. by a traceback),
+            # mapping will be closed once they're garbage collected
+            pass
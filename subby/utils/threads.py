@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def map_in_threads(
+    function: Callable[[T], R],
+    inputs: Iterable[T],
+    executor: Executor | None = None,
+    workers: int | None = None
+) -> list[R]:
+    """
+    Runs a function on each input in a given executor (or a pool of `workers` threads), returns results in order
+
+    Exceptions are raised once all previous results are collected
+    """
+    inputs = list(inputs)
+    if executor is not None:
+        return list(executor.map(function, inputs))
+    if workers == 1 or len(inputs) < 2:
+        return [function(item) for item in inputs]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(function, inputs))
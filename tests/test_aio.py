@@ -0,0 +1,117 @@
+import asyncio
+import threading
+
+from subby import CommonIssuesFixer, SDHStripper, SMPTEConverter, WebVTTConverter
+from subby import aio
+from subby.converters.base import BaseConverter
+
+TTML_TEMPLATE = '''<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml"><body><div>
+<p begin="00:00:{n:02d}.000" end="00:00:{n:02d}.500">Line  {n}<br/>[MUSIC PLAYING]</p>
+</div></body></tt>'''
+
+WEBVTT_STREAM = 'WEBVTT\n\n' + ''.join(
+    f'00:{i // 60:02d}:{i % 60:02d}.000 --> 00:{i // 60:02d}:{i % 60:02d}.500\nLine {i}\n\n' for i in range(200)
+)
+
+
+class BrokenConverter(BaseConverter):
+    """Converter failing after a few lines"""
+
+    def parse(self, stream):
+        return list(self.iter_parse(stream))
+
+    def iter_parse(self, stream):
+        yield from WebVTTConverter().iter_parse(stream)
+        raise ValueError('Broken file')
+
+
+def test_convert_and_process():
+    inputs = [TTML_TEMPLATE.format(n=n) for n in range(1, 20)]
+    converter, fixer, stripper = SMPTEConverter(), CommonIssuesFixer(), SDHStripper()
+    converted = [converter.from_string(data) for data in inputs]
+
+    async def run():
+        async with aio.AsyncRunner(workers=4) as runner:
+            srts = await asyncio.gather(*(runner.convert(converter, data) for data in inputs))
+            assert srts == converted
+            assert await asyncio.gather(*(runner.process(stripper, srt) for srt in srts)) == [
+                stripper.from_srt(srt) for srt in converted
+            ]
+
+        # Module-level functions use a shared runner
+        srt = await aio.convert(converter, inputs[0].encode('utf-8'))
+        assert await aio.process(fixer, srt, language='en') == fixer.from_srt(converted[0], language='en')
+
+    asyncio.run(run())
+
+
+def test_iter_cues():
+    data = WEBVTT_STREAM.encode('utf-8')
+    expected = list(WebVTTConverter().from_bytes(data))
+
+    async def run(buffer):
+        return [cue async for cue in aio.iter_cues(WebVTTConverter(), data, buffer=buffer)]
+
+    assert asyncio.run(run(1)) == expected
+    assert asyncio.run(run(1000)) == expected
+
+    async def run_broken():
+        cues = []
+        try:
+            async for cue in aio.iter_cues(BrokenConverter(), data):
+                cues.append(cue)
+        except ValueError:
+            return cues
+
+    assert asyncio.run(run_broken()) == expected
+
+
+def test_backpressure_and_cancellation():
+    release = threading.Event()
+    started = []
+
+    def job(name):
+        started.append(name)
+        release.wait(5)
+        return name
+
+    async def run():
+        async with aio.AsyncRunner(workers=2, limit=1) as runner:
+            first = asyncio.create_task(runner.run(job, 'first'))
+            waiting = asyncio.create_task(runner.run(job, 'waiting'))
+            last = asyncio.create_task(runner.run(job, 'last'))
+            await asyncio.sleep(0.1)
+            # Only a single job is submitted at once, the others wait in the event loop
+            assert started == ['first']
+
+            waiting.cancel()
+            release.set()
+            assert await first == 'first'
+            assert await last == 'last'
+            assert waiting.cancelled()
+            assert started == ['first', 'last']
+
+    asyncio.run(run())
+
+
+def test_iter_cues_stops_converting():
+    data = WEBVTT_STREAM.encode('utf-8')
+
+    async def run():
+        runner = aio.AsyncRunner(workers=1)
+        cues = runner.iter_cues(WebVTTConverter(), data, buffer=2)
+        assert (await cues.__anext__()).content == 'Line 0'
+        await cues.aclose()
+        # Converting thread is stopped, and its slot is free again
+        assert (await runner.convert(WebVTTConverter(), data))[0].content == 'Line 0'
+        runner.close()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+
+if __name__ == "__main__":
+    test_convert_and_process()
+    test_iter_cues()
+    test_backpressure_and_cancellation()
+    test_iter_cues_stops_converting()
@@ -0,0 +1,81 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from subby import CommonIssuesFixer, WebVTTConverter
+from subby.batch import convert_files, detect_inputs, find_inputs
+
+WEBVTT_TEST = '''WEBVTT
+
+00:00:01.000 --> 00:00:02.000
+[DOOR CREAKS]
+First line {}.
+
+00:00:03.000 --> 00:00:04.000
+Second line.
+'''
+
+
+def test_batch_conversion():
+    with TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for i in range(3):
+            (directory / f'test{i}.vtt').write_text(WEBVTT_TEST.format(i))
+        (directory / 'notes.txt').write_text('Not a subtitle')
+
+        files, unrecognized = detect_inputs(find_inputs(str(directory)))
+        assert [file.name for file, _ in files] == ['test0.vtt', 'test1.vtt', 'test2.vtt']
+        assert [file.name for file in unrecognized] == ['notes.txt']
+        assert [file.name for file in find_inputs(str(directory / '*.vtt'))] == ['test0.vtt', 'test1.vtt', 'test2.vtt']
+
+        for workers in (1, 2):
+            out = directory / f'out{workers}'
+            out.mkdir()
+            results = list(convert_files(files, workers=workers, out=out, strip_sdh=True))
+
+            assert [result.error for result in results] == [None] * 3
+            assert [result.lines for result in results] == [2] * 3
+            for i, result in enumerate(results):
+                assert [output.name for output in result.outputs] == [f'test{i}.srt', f'test{i}_sdh_stripped.srt']
+
+                expected, _ = CommonIssuesFixer().from_srt(WebVTTConverter().from_string(WEBVTT_TEST.format(i)))
+                assert result.outputs[0].read_text(encoding='utf-8') == expected.export()
+                assert '[DOOR CREAKS]' not in result.outputs[1].read_text(encoding='utf-8')
+
+
+def test_batch_conversion_error():
+    with TemporaryDirectory() as directory:
+        file = Path(directory) / 'broken.vtt'
+        file.write_text('WEBVTT\n\n00:00 --> 00:01\nBroken line.\n')
+
+        [result] = convert_files(detect_inputs([file])[0])
+        assert result.error
+
+
+def test_batch_conversion_same_names():
+    with TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for i, name in enumerate(('ep1.vtt', 'ep1.webvtt', 'ep2.vtt')):
+            (directory / name).write_text(WEBVTT_TEST.format(i))
+        files, _ = detect_inputs(find_inputs(str(directory)))
+
+        for workers in (1, 2):
+            out = directory / f'out{workers}'
+            out.mkdir()
+            results = list(convert_files(files, workers=workers, out=out))
+            assert [result.error for result in results] == [None] * 3
+            assert [output.name for result in results for output in result.outputs] == [
+                'ep1.vtt.srt', 'ep1.webvtt.srt', 'ep2.srt'
+            ]
+            assert 'First line 1.' in (out / 'ep1.webvtt.srt').read_text(encoding='utf-8')
+
+        # Outputs which clash even with suffixes kept aren't converted
+        (directory / 'ep1.vtt.vtt').write_text(WEBVTT_TEST.format(3))
+        files, _ = detect_inputs([directory / name for name in ('ep1.vtt', 'ep1.webvtt', 'ep1.vtt.vtt')])
+        results = list(convert_files(files, workers=1, out=directory / 'out1'))
+        assert [bool(result.error) for result in results] == [True, False, True]
+
+
+if __name__ == "__main__":
+    test_batch_conversion()
+    test_batch_conversion_error()
+    test_batch_conversion_same_names()
@@ -0,0 +1,44 @@
+from subby import CommonIssuesFixer, LineCache, SDHStripper
+
+REPETITIVE_EXAMPLE = ''.join(
+    f'{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\n{text}\n\n'
+    for i, text in enumerate(['[MUSIC PLAYING]', '- What?\n- Nothing.', '♪ ♪', 'JOHN: What?'] * 5, 1)
+)
+
+
+def test_line_cache():
+    cache = LineCache(maxsize=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'  # "b" is now least recently used
+    cache.put('c', 'C')
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 'C'
+    assert cache.info() == (2, 1, 2, 2)
+
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
+
+
+def test_processors_with_cache():
+    cache = LineCache()
+    for processor, cached_processor in (
+        (CommonIssuesFixer(), CommonIssuesFixer(cache=cache)),
+        (SDHStripper(), SDHStripper(cache=cache)),
+        (SDHStripper(extra_regexes=['Nothing']), SDHStripper(extra_regexes=['Nothing'], cache=cache)),
+    ):
+        expected = processor.from_string(REPETITIVE_EXAMPLE)
+        assert cached_processor.from_string(REPETITIVE_EXAMPLE) == expected
+        # Second file is processed entirely from cache
+        hits = cache.hits
+        assert cached_processor.from_string(REPETITIVE_EXAMPLE) == expected
+        assert cache.hits > hits
+
+    # Each processor (and its settings) caches lines separately
+    assert len(cache) == 4 + 4 + 4
+
+
+if __name__ == "__main__":
+    test_line_cache()
+    test_processors_with_cache()
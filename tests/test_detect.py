@@ -0,0 +1,44 @@
+from subby import (BilibiliJSONConverter, ISMTConverter, SAMIConverter, SMPTEConverter, WebVTTConverter,
+                   WVTTConverter)
+from subby.detect import FORMATS, PREFIX_SIZE, detect, detect_format, register
+
+WEBVTT_TEST = b'\xef\xbb\xbfWEBVTT\n\n00:00:01.000 --> 00:00:02.000\nFirst line.\n'
+SMPTE_TEST = b'<?xml version="1.0" encoding="utf-8"?>\n<tt:tt xmlns:tt="http://www.w3.org/ns/ttml">'
+SAMI_TEST = b'<SAMI>\n<HEAD>\n<TITLE>Test</TITLE>'
+BILIBILI_TEST = b'{"font_size":0.4,"background_color":"#9C27B0","Stroke":"none","body":[]}'
+ISMT_TEST = b'\x00\x00\x00\x1cftypiso6\x00\x00\x00\x00' + b'\x00' * 12 + b'\x00\x00\x00\x10stsd\x00\x00\x00\x01stpp'
+WVTT_TEST = b'\x00\x00\x00\x18stypmsdh\x00\x00\x00\x00' + b'\x00' * 8 + b'\x00\x00\x00\x10mdat\x00\x00\x00\x08vttc'
+
+
+def test_detect():
+    assert detect(WEBVTT_TEST) is WebVTTConverter
+    assert detect(SMPTE_TEST) is SMPTEConverter
+    assert detect(SAMI_TEST) is SAMIConverter
+    assert detect(BILIBILI_TEST) is BilibiliJSONConverter
+    assert detect(ISMT_TEST) is ISMTConverter
+    assert detect(WVTT_TEST) is WVTTConverter
+    assert detect(b'1\n00:00:01,000 --> 00:00:02,000\nFirst line.\n') is None
+
+
+def test_detect_reads_only_prefix():
+    assert detect(b' ' * PREFIX_SIZE + WEBVTT_TEST) is None
+    assert detect(memoryview(WEBVTT_TEST + b' ' * PREFIX_SIZE)) is WebVTTConverter
+
+
+def test_register():
+    formats = FORMATS.copy()
+    try:
+        @register('SubRip', SMPTEConverter, first=True)
+        def _sniff_srt(prefix: bytes) -> bool:
+            return b' --> ' in prefix
+
+        assert detect_format(WEBVTT_TEST).name == 'SubRip'
+        assert detect(WEBVTT_TEST) is SMPTEConverter
+    finally:
+        FORMATS[:] = formats
+
+
+if __name__ == "__main__":
+    test_detect()
+    test_detect_reads_only_prefix()
+    test_register()
@@ -0,0 +1,64 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from subby import CommonIssuesFixer, SMPTEConverter
+from subby.utils.files import map_file
+
+SMPTE_TEST = '''﻿<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <body>
+    <div>
+      <p begin="00:00:01.000" end="00:00:02.000">Première ligne</p>
+      <p begin="00:00:03.000" end="00:00:04.000"><span tts:fontStyle="italic">Second line</span></p>
+    </div>
+  </body>
+</tt>
+'''.encode('utf-8')
+
+SRT_TEST = b'''1\r
+00:00:01,000 --> 00:00:02,000\r
+First line\r
+\r
+2\r
+00:00:03,000 --> 00:00:04,000\r
+Second line\r
+'''
+
+
+def test_map_file():
+    with TemporaryDirectory() as directory:
+        file = Path(directory) / 'test.bin'
+        for data in (b'', SRT_TEST):
+            file.write_bytes(data)
+            with file.open(mode='rb') as stream, map_file(stream) as mapped:
+                assert mapped[:] == data
+
+
+def test_converter_from_file():
+    converter = SMPTEConverter()
+    with TemporaryDirectory() as directory:
+        file = Path(directory) / 'test.ttml'
+        file.write_bytes(SMPTE_TEST)
+
+        srt = converter.from_file(file)
+        assert srt == converter.from_file(file, memory_map=False)
+        assert srt == converter.from_bytes(SMPTE_TEST)
+        assert srt == converter.parse_buffer(bytearray(SMPTE_TEST))
+        assert [line.content for line in srt] == ['Première ligne', '<i>Second line</i>']
+
+
+def test_processor_from_file():
+    processor = CommonIssuesFixer()
+    with TemporaryDirectory() as directory:
+        file = Path(directory) / 'test.srt'
+        file.write_bytes(SRT_TEST)
+
+        srt, _ = processor.from_file(file)
+        assert srt == processor.from_string(SRT_TEST.decode('utf-8'))[0]
+        assert [line.content for line in srt] == ['First line', 'Second line']
+
+
+if __name__ == "__main__":
+    test_map_file()
+    test_converter_from_file()
+    test_processor_from_file()
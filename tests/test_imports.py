@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ('bs4', 'lxml', 'pymp4', 'construct', 'tinycss', 'ftfy', 'langcodes')
+
+
+def _imported_heavy_modules(statement: str) -> set[str]:
+    """Runs statement in a new interpreter and returns heavy modules it imported"""
+    code = (
+        f'import sys\n{statement}\n'
+        f'print(" ".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_package_import_is_lazy():
+    assert _imported_heavy_modules('import subby') == set()
+    assert _imported_heavy_modules('import subby.cli') == set()
+    assert _imported_heavy_modules('import subby.aio') == set()
+
+
+def test_class_import_loads_only_its_dependencies():
+    assert _imported_heavy_modules('from subby import SDHStripper') == set()
+    assert _imported_heavy_modules('from subby import SubRipFile') == set()
+    assert _imported_heavy_modules('from subby import Pipeline') == set()
+    assert _imported_heavy_modules('from subby import WebVTTConverter') == {'tinycss'}
+    assert _imported_heavy_modules('from subby import CommonIssuesFixer') == {'ftfy', 'langcodes'}
+
+
+def test_lazy_attributes():
+    import subby
+    from subby.converters.webvtt import WebVTTConverter
+
+    assert subby.WebVTTConverter is WebVTTConverter
+    assert set(subby.__all__) <= set(dir(subby))
+
+
+if __name__ == "__main__":
+    test_package_import_is_lazy()
+    test_class_import_loads_only_its_dependencies()
+    test_lazy_attributes()
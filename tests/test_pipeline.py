@@ -0,0 +1,96 @@
+from subby import CommonIssuesFixer, Pipeline, SDHStripper, SubRipFile, WebVTTConverter
+from subby.processors.base import FileStage
+
+SDH_EXAMPLE = '''1
+00:00:11,803 --> 00:00:13,346
+RADIO ANNOUNCER:
+<i>"W" who?</i>
+
+2
+00:00:40,749 --> 00:00:42,375
+- ♪ Hey, boo ♪
+- ♪ Hey, boo ♪
+
+3
+00:00:55,931 --> 00:00:58,134
+[ Maker's "Hold'em" playing ]
+
+4
+00:00:59,292 --> 00:01:01,561
+- [shouting]
+- Boo!
+
+5
+00:01:01,561 --> 00:01:03,000
+- [shouting]
+- Boo!
+
+6
+00:01:09,653 --> 00:01:11,822
+It's zoo   time!
+[ Kids cheering ]
+'''
+
+WEBVTT_TEST = '''WEBVTT
+
+00:00:01.000 --> 00:00:02.000
+[DOOR CREAKS]
+First  line.
+
+00:00:02.000 --> 00:00:03.000
+<i>Second line.</i>
+
+00:00:03.000 --> 00:00:04.000
+[MUSIC PLAYING]
+'''
+
+
+def test_pipeline_matches_sequential_processing():
+    for language in (None, 'en', 'ar'):
+        expected, _ = SDHStripper().from_string(SDH_EXAMPLE, language)
+        expected, _ = CommonIssuesFixer().from_srt(expected, language)
+
+        pipeline = Pipeline(SDHStripper(), CommonIssuesFixer())
+        srt, status = pipeline.from_string(SDH_EXAMPLE, language)
+        assert srt == expected and status
+        srt, status = pipeline.from_srt(SubRipFile.from_string(SDH_EXAMPLE).compact(), language)
+        assert srt == expected and status
+
+    # Already processed subtitles aren't changed
+    assert not Pipeline(SDHStripper(), CommonIssuesFixer()).from_srt(expected, 'ar')[1]
+
+
+def test_pipeline_keeps_lines_to_combine():
+    # Line emptied by fixing its text is combined with the next one, before blank lines are removed
+    example = (
+        '1\n01:00:01,145 --> 01:00:02,145\n-  </i>\n\n'
+        '2\n01:00:02,230 --> 01:00:02,730\n(whispering) hi<i>[music]</i>\n'
+    )
+    expected, _ = SDHStripper().from_string(example)
+    expected, _ = CommonIssuesFixer().from_srt(expected)
+    srt, _ = Pipeline(SDHStripper(), CommonIssuesFixer()).from_string(example)
+    assert srt == expected
+    assert srt.export() == '1\n01:00:01,145 --> 01:00:02,730\nhi\n\n'
+
+
+def test_pipeline_with_converter():
+    expected, _ = SDHStripper().from_srt(WebVTTConverter().from_string(WEBVTT_TEST))
+    expected, _ = CommonIssuesFixer().from_srt(expected)
+
+    srt, status = Pipeline(SDHStripper(), CommonIssuesFixer(), converter=WebVTTConverter()).from_string(WEBVTT_TEST)
+    assert srt == expected and status
+    assert [line.content for line in srt] == ['First line.', '<i>Second line.</i>']
+
+
+def test_pipeline_plan():
+    # Text of lines is fixed before timing is, but only after lines left blank by stripping SDH are removed
+    plan = Pipeline(SDHStripper(), CommonIssuesFixer()).plan()
+    assert [isinstance(stage, FileStage) for stage in plan] == [False, True, False, True, True]
+    assert len(plan[0]) == len(plan[2]) == 1
+
+
+if __name__ == "__main__":
+    test_pipeline_matches_sequential_processing()
+    test_pipeline_keeps_lines_to_combine()
+    test_pipeline_with_converter()
+    test_pipeline_plan()
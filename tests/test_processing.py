@@ -1,6 +1,11 @@
 from datetime import time, timedelta
+from time import perf_counter
 
-from subby import CommonIssuesFixer
+from srt import timedelta_to_srt_timestamp
+
+from subby import CommonIssuesFixer, LineCache
+from subby.processors import common_issues
+from subby.processors.common_issues import RuleStats
 
 
 MUSICAL_NOTE_EXAMPLE = '''1
@@ -156,6 +161,23 @@ DUPE_ALIGNMENT_EXAMPLE = '''1
 {\\an8}but my mind is old'''
 
 
+ENCODING_EXAMPLE = '''1
+00:01:00,000 --> 00:01:01,000
+â™ª Song Lyrics â™ª
+
+2
+00:02:00,000 --> 00:02:01,000
+She's my protÃ©gÃ©.
+
+3
+00:03:00,000 --> 00:03:01,000
+Café, crème brûlée
+
+4
+00:04:00,000 --> 00:04:01,000
+Tom &amp;amp;amp; Jerry'''
+
+
 def test_musical_notes():
     fixer = CommonIssuesFixer()
     srt, _ = fixer.from_string(MUSICAL_NOTE_EXAMPLE)
@@ -215,6 +237,9 @@ def test_gap_removal():
     assert srt2[0].end == timedelta(minutes=19, milliseconds=100)
     assert srt2[1].start == timedelta(minutes=19, milliseconds=183)
 
+    # Same as setting it in the constructor
+    assert CommonIssuesFixer(remove_gaps=False).from_string(GAP_REMOVAL_EXAMPLE)[0] == srt2
+
 
 # Test redundant space removal
 def test_redundant_space_removal():
@@ -258,6 +283,64 @@ def test_dupe_alignment_tags():
     assert srt[0].content == "{\\an8}I'm only nineteen\nbut my mind is old"
 
 
+# Test encoding fixes (and that clean lines are left alone)
+def test_encoding_fixes():
+    fixer = CommonIssuesFixer()
+    srt, _ = fixer.from_string(ENCODING_EXAMPLE)
+    assert srt[0].content == '♪ Song Lyrics ♪'
+    assert srt[1].content == "She's my protégé."
+    assert srt[2].content == 'Café, crème brûlée'
+    assert srt[3].content == 'Tom & Jerry'
+
+
+# Test that rule statistics are collected without affecting results
+def test_rule_stats():
+    stats = RuleStats()
+    srt, _ = CommonIssuesFixer(rule_stats=stats).from_string(MUSICAL_NOTE_EXAMPLE)
+    expected, _ = CommonIssuesFixer().from_string(MUSICAL_NOTE_EXAMPLE)
+    assert srt == expected
+
+    report = {name: (skipped, applied, changed) for name, skipped, applied, changed in stats.report()}
+    # Every rule is either skipped or applied for each pass over each line
+    assert len({skipped + applied for skipped, applied, _ in report.values()}) == 1
+    # No line has double spaces, notes are only moved into italics on lines which have them
+    assert report[' {2,}'][1:] == (0, 0)
+    assert report['♪ <i>(.*)'] == (19, 2, 2)
+
+
+# Test that line splits take linear time on long lines without line breaks (e.g. live captions)
+def test_long_line_splits():
+    fixer = CommonIssuesFixer()
+    content = 'and the ball goes wide ( ' * 2000 + ') [crowd]Corner kick.What a save'
+    start = perf_counter()
+    fixed = fixer._fix_content(content)
+    assert perf_counter() - start < 1
+    # Spaces are removed inside the outermost brackets, line is split after the last bracket and sentence
+    assert fixed.startswith('and the ball goes wide (and the ball')
+    assert fixed.endswith('wide () [crowd]\n- Corner kick.\n- What a save')
+
+
+# Test reporting lines over the processing budget
+def test_line_budget(caplog):
+    CommonIssuesFixer(line_budget=0).from_string(MUSICAL_NOTE_EXAMPLE)
+    assert 'over the budget of 0' in caplog.records[0].getMessage()
+    assert caplog.records[0].levelname == 'WARNING'
+
+
+# Test fixing text of lines in worker processes
+def test_workers(monkeypatch):
+    # Small chunks, so that a few lines are fixed in worker processes
+    monkeypatch.setattr(common_issues, 'WORKER_CHUNK_LINES', 10)
+    example = ''.join(
+        f'{i}\n{timedelta_to_srt_timestamp(timedelta(seconds=i))} --> '
+        f'{timedelta_to_srt_timestamp(timedelta(seconds=i, milliseconds=500))}\n<i>Line  {i}...</i>\n\n'
+        for i in range(1, 40)
+    )
+    expected = CommonIssuesFixer().from_string(example)
+    assert CommonIssuesFixer(workers=2).from_string(example) == expected
+    assert CommonIssuesFixer(cache=LineCache(), workers=2).from_string(example) == expected
+
+
 if __name__ == "__main__":
     test_musical_notes()
     test_adding_line_breaks()
@@ -269,3 +352,7 @@ if __name__ == "__main__":
     test_invalid_timestamp_fixing()
     test_fix_overlapping_time()
     test_dupe_alignment_tags()
+    test_encoding_fixes()
+    test_rule_stats()
+    test_long_line_splits()
+    # test_line_budget and test_workers use pytest fixtures, and run with pytest
@@ -1,4 +1,9 @@
-from subby import SDHStripper, CommonIssuesFixer
+import re
+import time
+
+import pytest
+
+from subby import SDHStripper, CommonIssuesFixer, Pipeline, SubRipFile
 
 EXAMPLE_1 = '''1
 00:00:11,803 --> 00:00:13,346
@@ -72,5 +77,102 @@ def test_sdh_stripping():
     assert srt[7].content == 'SO THIS IS MY HOME OFFICE\nHERE. IN THIS OFFICE ARE A LOT'
 
 
+def test_inplace_processing():
+    for srt in (SubRipFile.from_string(EXAMPLE_1), SubRipFile.from_string(EXAMPLE_1).compact()):
+        expected, expected_status = SDHStripper().from_srt(srt)
+        stripped, status = SDHStripper(inplace=True).from_srt(srt)
+        assert (stripped, status) == (expected, expected_status) and status
+        expected, expected_status = CommonIssuesFixer().from_srt(stripped)
+        fixed, status = CommonIssuesFixer(inplace=True).from_srt(stripped)
+        assert (fixed, status) == (expected, expected_status) and status
+        # Nothing to change on already processed lines
+        assert not SDHStripper(inplace=True).from_srt(fixed)[1]
+        assert not CommonIssuesFixer(inplace=True).from_srt(fixed)[1]
+
+
+def test_inplace_status_of_dropped_lines():
+    # Changes to lines which aren't exported (zero duration here) don't change the file, in either mode
+    for processor, content in ((SDHStripper, '[door]'), (CommonIssuesFixer, 'Hi  there')):
+        source = f'1\n00:00:03,000 --> 00:00:03,000\n{content}\n\n2\n00:00:04,000 --> 00:00:05,000\nHi\n'
+        for srt in (SubRipFile.from_string(source), SubRipFile.from_string(source).compact()):
+            assert not processor().from_srt(srt)[1]
+            assert not Pipeline(processor()).from_srt(srt)[1]
+            assert not processor(inplace=True).from_srt(srt)[1]
+
+
+def test_lines_without_sdh():
+    stripper = SDHStripper(extra_regexes=['Hello '])
+    # Lines without any SDH characters are only stripped of whitespace (and extra regexes)
+    assert stripper._strip_content('  Hello there\nGeneral Kenobi  ') == 'there\nGeneral Kenobi'
+    assert stripper._strip_content('<i> </i>') == ''
+    assert stripper._strip_content('{\\an8}<i>Hello</i>') == '{\\an8}<i>Hello</i>'
+
+
+def _alternation(terms):
+    """Single regex matching given terms, longer ones first"""
+    return '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+
+def test_extra_terms():
+    terms = ['Hey', 'Hey, boo', 'zoo']
+    stripped = SDHStripper(extra_terms=terms).from_string(EXAMPLE_1)
+    # Same as a single alternation of escaped terms, with longer terms first
+    assert stripped == SDHStripper(extra_regexes=[_alternation(terms)]).from_string(EXAMPLE_1)
+    assert stripped[0][1].content == '- ♪  ♪\n- ♪  ♪'
+
+    # Overlapping terms are removed where they're found first, not one term after another
+    for terms, content, expected in (
+        (['bc', 'ab'], 'abc', 'c'),
+        (['b', 'abc', 'bcd'], 'abcd', 'd'),
+        (['a.', 'a'], 'a.a?a', '?'),
+    ):
+        stripper = SDHStripper(extra_terms=terms)
+        assert stripper._run_extra_regexes(content) == expected
+        assert re.sub(_alternation(terms), '', content) == expected
+    # Automaton is built once for each list of terms
+    assert SDHStripper(extra_terms=terms).extra_terms is SDHStripper(extra_terms=list(terms)).extra_terms
+
+
+def _adversarial_lines(size):
+    """Malformed lines, which previously made regexes backtrack exponentially (or polynomially)"""
+    # Anchored patterns are retried on each line start, so blank lines are fewer
+    lines = size // 10
+    return [
+        '[' + ' ' * size + 'x',
+        '(' + '\n' * lines + 'x',
+        '- [' + ' \n' * lines,
+        ' \n' * lines + 'x(y)',
+        '\n' * lines + '[',
+        '-' + ' ' * size + 'x',
+        ' ' * size + '<i>' + ' ' * size + '-x',
+        'JOHN' + ' ' * size + 'x',
+        '<i>-' + ' ' * size + '(whispering)' + ' ' * size + 'x',
+        '♪' + ' ' * size + 'x',
+    ]
+
+
+def test_adversarial_lines():
+    stripper = SDHStripper()
+    for content in _adversarial_lines(2000):
+        start = time.perf_counter()
+        stripper._strip_content(content)
+        assert time.perf_counter() - start < 0.5, repr(content[:20])
+
+
+def test_deadline():
+    srt = SubRipFile.from_string(EXAMPLE_1)
+    assert SDHStripper(deadline=60).from_srt(srt) == SDHStripper().from_srt(srt)
+
+    long_srt = SubRipFile.from_string('\n\n'.join([EXAMPLE_1] * 500))
+    with pytest.raises(TimeoutError):
+        SDHStripper(deadline=0.001).from_srt(long_srt)
+
+
 if __name__ == "__main__":
     test_sdh_stripping()
+    test_inplace_processing()
+    test_inplace_status_of_dropped_lines()
+    test_lines_without_sdh()
+    test_extra_terms()
+    test_adversarial_lines()
+    test_deadline()
@@ -0,0 +1,143 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from subby import SMPTEConverter
+from subby.converters import smpte
+
+TTML_SAMPLE = '''<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling"
+    xmlns:ttp="http://www.w3.org/ns/ttml#parameter" ttp:tickRate="10000000" ttp:frameRate="25">
+<head>
+<metadata><smpte:information xmlns:smpte="http://www.smpte-ra.org/schemas/2052-1/2010/smpte-tt" origin="x"/></metadata>
+<styling>
+<style xml:id="italic" tts:fontStyle="italic"/>
+<style xml:id="normal" tts:fontStyle="normal"/>
+<style xml:id="ruby" tts:ruby="text"/>
+</styling>
+<layout><region xml:id="top" tts:displayAlign="before"/><region xml:id="bottom" tts:displayAlign="after"/></layout>
+</head>
+<body><div>
+<p begin="10000000t" end="25000000t" style="italic">Line &amp; <span style="normal">one</span><br/>continued</p>
+<p begin="00:00:03.000" end="00:00:04.000" region="top">Top <span tts:fontStyle="italic">two</span></p>
+<p begin="00:00:05:10" end="00:00:06:00" region="bottom">Bottom <!-- comment --> <span>three</span></p>
+<p begin="7000ms" end="8000ms">九龍<span style="ruby">クーロン</span></p>
+<p end="00:00:09.000">No begin</p>
+<p begin="00:00:10.000" end="00:00:11.000">   </p>
+</div></body>
+</tt>'''
+
+STYLED_SAMPLE = '''<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling">
+<head>
+<styling>
+<style xml:id="speaker" style="base" tts:color="yellow"/>
+<style xml:id="base" style="emphasis"/>
+<style xml:id="emphasis" tts:fontStyle="italic"/>
+<style xml:id="normal" tts:fontStyle="normal"/>
+<style xml:id="ruby" style="annotation"/>
+<style xml:id="annotation" tts:ruby="text"/>
+<style xml:id="loop" style="loop"/>
+</styling>
+<layout>
+<region xml:id="bottom" tts:displayAlign="after"/>
+<region xml:id="top" style="speaker" tts:displayAlign="before"/>
+<region xml:id="narration"><style tts:fontStyle="italic"/></region>
+</layout>
+</head>
+<body region="bottom"><div>
+<p begin="00:00:01.000" end="00:00:02.000" style="speaker">Chained</p>
+<p begin="00:00:03.000" end="00:00:04.000" style="normal speaker">Last reference first</p>
+<p begin="00:00:05.000" end="00:00:06.000" style="speaker normal">Last reference last</p>
+<p begin="00:00:07.000" end="00:00:08.000"
+    >Said <span style="base">quietly</span> and 九龍<span style="ruby">クーロン</span></p>
+<p begin="00:00:09.000" end="00:00:10.000" style="loop">Loop <span>bare</span></p>
+<div region="top">
+<p begin="00:00:11.000" end="00:00:12.000">From the region</p>
+<p begin="00:00:13.000" end="00:00:14.000" style="normal">Top <span region="top">still top</span></p>
+</div>
+<div region="narration"><p begin="00:00:15.000" end="00:00:16.000">Nested style</p></div>
+<p begin="00:00:17.000" end="00:00:18.000">Back to the bottom</p>
+</div></body>
+</tt>'''
+
+
+def test_streamed_same_as_beautifulsoup():
+    expected = smpte._SMPTEConverter(TTML_SAMPLE).srt
+    assert len(expected) == 4
+    assert smpte._SMPTEStreamConverter(TTML_SAMPLE).srt == expected
+    assert SMPTEConverter().from_string(TTML_SAMPLE) == expected
+    # Multiple documents in a single file
+    assert list(SMPTEConverter().from_string(TTML_SAMPLE + '\n' + TTML_SAMPLE)) == list(expected) * 2
+
+    expected = smpte._SMPTEConverter(STYLED_SAMPLE).srt
+    assert smpte._SMPTEStreamConverter(STYLED_SAMPLE).srt == expected
+
+
+def test_style_inheritance():
+    srt = SMPTEConverter().from_string(STYLED_SAMPLE)
+    assert [line.content for line in srt] == [
+        '<i>Chained</i>',
+        '<i>Last reference first</i>',
+        'Last reference last',
+        'Said <i>quietly</i> and 九龍(クーロン)',
+        'Loop <i>bare</i>',
+        '{\\an8}<i>From the region</i>',
+        '{\\an8}Top still top',
+        '<i>Nested style</i>',
+        'Back to the bottom',
+    ]
+
+
+def test_unsupported_documents():
+    for data in (
+        # Malformed
+        TTML_SAMPLE.replace('</span>', '', 1),
+        # Style following lines
+        TTML_SAMPLE.replace('</div>', '<style xml:id="late" tts:fontStyle="italic"/></div>'),
+    ):
+        # Not streamed, converted with BeautifulSoup instead
+        with pytest.raises(smpte._Unsupported):
+            smpte._SMPTEStreamConverter(data)
+        assert SMPTEConverter().from_string(data) == smpte._SMPTEConverter(data).srt
+
+
+def test_whitespace_before_declaration():
+    srt = SMPTEConverter().from_string('\n  ' + TTML_SAMPLE)
+    assert srt == SMPTEConverter().from_string(TTML_SAMPLE)
+    assert srt[0].content == '<i>Line & one\ncontinued</i>'
+
+
+def test_buffer():
+    expected = SMPTEConverter().from_string(TTML_SAMPLE)
+    data = b'\xef\xbb\xbf \n' + TTML_SAMPLE.encode('utf-8')
+    assert SMPTEConverter().parse_buffer(data) == expected
+    assert SMPTEConverter().from_bytes(data) == expected
+    with TemporaryDirectory() as directory:
+        file = Path(directory) / 'test.dfxp'
+        file.write_bytes(data)
+        assert SMPTEConverter().from_file(file) == expected
+
+    # Malformed data is still decoded as a whole
+    with pytest.raises(UnicodeDecodeError):
+        SMPTEConverter().parse_buffer(data.replace(b'Line', b'\xff'))
+
+
+def test_stream_errors_not_hidden(monkeypatch):
+    def broken(*args):
+        raise TypeError('Broken')
+
+    monkeypatch.setattr(smpte._SMPTEStreamConverter, '_convert_line', broken)
+    # Errors aren't hidden by converting again
+    with pytest.raises(TypeError):
+        SMPTEConverter().from_string(TTML_SAMPLE)
+
+
+if __name__ == "__main__":
+    test_streamed_same_as_beautifulsoup()
+    test_style_inheritance()
+    test_unsupported_documents()
+    test_whitespace_before_declaration()
+    test_buffer()
+    # test_stream_errors_not_hidden uses a pytest fixture, and runs with pytest
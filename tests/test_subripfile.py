@@ -0,0 +1,150 @@
+import copy
+from datetime import timedelta
+from io import BytesIO
+
+import srt
+
+from subby import CommonIssuesFixer, SDHStripper
+from subby.subripfile import WRITE_CHUNK_SIZE, CompactSubRipFile, SubRipFile, parse_srt
+
+UNSORTED_EXAMPLE = '''1
+00:00:05,000 --> 00:00:06,000
+Third line
+
+2
+00:00:01,000 --> 00:00:02,500
+First line
+
+3
+00:00:03,000 --> 00:00:03,000
+Invalid line
+
+4
+00:00:03,000 --> 00:00:04,000
+Second line
+with a line break
+
+5
+00:00:07,000 --> 00:00:08,000
+
+'''
+
+IRREGULAR_EXAMPLE = '''\ufeff1
+00:00:01,000 --> 00:00:02,000 X1:100 X2:200
+Line with position
+
+00:00:03.000 --> 00:00:04.000
+Line without an index
+
+
+3
+00:00:05,000 --> 00:00:06,000
+Line with
+
+a blank line
+4
+00:00:07,000 --> 00:00:08,000
+12 apples
+-5 degrees
+
+5
+00:00:09,000 --> 00:00:10,000
+
+
+6
+00:00:11,000 --> 00:00:12,000
+Last line
+trailing garbage'''
+
+
+def test_parse_srt_matches_srt():
+    for source in (UNSORTED_EXAMPLE, IRREGULAR_EXAMPLE):
+        for eol in ('\n', '\r\n'):
+            data = source.replace('\n', eol)
+            assert list(parse_srt(data)) == list(srt.parse(data, ignore_errors=True))
+
+
+def test_compact_export():
+    srt = SubRipFile.from_string(UNSORTED_EXAMPLE)
+    compact = srt.compact()
+
+    assert len(compact) == len(srt)
+    assert compact.export() == srt.export()
+    assert compact.export(eol='\r\n') == srt.export(eol='\r\n')
+    assert compact == srt
+    # Invalid and blank lines aren't exported
+    assert compact.exported_lines() == srt.exported_lines()
+    assert [content for *_, content in srt.exported_lines()] == [
+        'First line', 'Second line\nwith a line break', 'Third line'
+    ]
+
+
+def test_compact_offset_sort_clean_indexes():
+    srt = SubRipFile.from_string(UNSORTED_EXAMPLE)
+    compact = srt.compact()
+
+    for subtitle in (srt, compact):
+        subtitle.offset(timedelta(seconds=1, milliseconds=5))
+    assert compact.export() == srt.export()
+
+    srt.sort()
+    compact.sort()
+    assert [line.content for line in compact] == [line.content for line in srt]
+    assert [line.index for line in compact] == [1, 2, 3, 4, 5]
+
+    srt.clean_indexes()
+    compact.clean_indexes()
+    assert compact.to_subripfile().data == srt.data
+
+
+def test_compact_views():
+    compact = CompactSubRipFile.from_string(UNSORTED_EXAMPLE)
+    line = compact[1]
+
+    assert line.start == timedelta(seconds=1)
+    assert line.end_ms == 2500
+
+    line.start += timedelta(milliseconds=250)
+    line.content = 'Changed'
+    assert compact.starts[1] == 1250
+    assert compact[1].content == 'Changed'
+
+    # Copies don't share columns
+    copied = copy.deepcopy(compact)
+    copied[1].content = 'Copy'
+    assert compact[1].content == 'Changed'
+
+
+def test_write_to():
+    srt = SubRipFile.from_string(UNSORTED_EXAMPLE)
+    # Enough lines to be written in multiple chunks
+    long_srt = SubRipFile(srt.data * (WRITE_CHUNK_SIZE // len(srt.export()) + 1))
+
+    for subtitle in (srt, srt.compact(), long_srt, long_srt.compact()):
+        for encoding, eol in (('utf-8-sig', None), ('utf-8', '\r\n'), ('utf-16', None)):
+            stream = BytesIO()
+            subtitle.write_to(stream, encoding=encoding, eol=eol)
+            assert stream.getvalue() == subtitle.export(eol=eol).encode(encoding)
+
+
+def test_processing_keeps_type():
+    srt = SubRipFile.from_string(UNSORTED_EXAMPLE)
+    fixed, _ = CommonIssuesFixer().from_srt(srt)
+    fixed_compact, _ = CommonIssuesFixer().from_srt(srt.compact())
+
+    assert type(fixed) is SubRipFile
+    assert isinstance(fixed_compact, CompactSubRipFile)
+    assert fixed_compact == fixed
+
+    stripped, _ = SDHStripper().from_srt(srt.compact())
+    assert isinstance(stripped, CompactSubRipFile)
+    assert stripped == SDHStripper().from_srt(srt)[0]
+
+
+if __name__ == "__main__":
+    test_parse_srt_matches_srt()
+    test_compact_export()
+    test_compact_offset_sort_clean_indexes()
+    test_compact_views()
+    test_write_to()
+    test_processing_keeps_type()
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+from subby import CommonIssuesFixer, LineCache, SAMIConverter, SDHStripper, SMPTEConverter, WebVTTConverter
+from subby.processors.common_issues import RuleStats
+
+TTML_TEMPLATE = '''<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling"
+    xmlns:ttp="http://www.w3.org/ns/ttml#parameter" ttp:tickRate="10000000">
+<head>
+<styling><style xml:id="s{n}" tts:fontStyle="italic"/></styling>
+<layout><region xml:id="top" tts:displayAlign="before"/></layout>
+</head>
+<body><div>
+<p begin="{n}0000000t" end="{n}5000000t" style="s{n}">Line {n}<br/>continued</p>
+<p begin="00:00:{n:02d}.600" end="00:00:{n:02d}.900" region="top">Top <span tts:fontStyle="italic">{n}</span></p>
+</div></body>
+</tt>'''
+
+SAMI_TEMPLATE = '''<SAMI><BODY>
+<SYNC Start={n}000><P Class=ENCC>Line {n}<br>continued
+<SYNC Start={n}500><P Class=ENCC>&nbsp;
+<SYNC Start={n}600><P Class=ENCC><i>Italic {n}</i>
+</BODY></SAMI>'''
+
+WEBVTT_TEMPLATE = '''WEBVTT
+
+00:00:{n:02d}.000 --> 00:00:{n:02d}.500
+<i>Line {n}</i>
+
+00:00:{n:02d}.600 --> 00:00:{n:02d}.900 line:10%
+Top {n}
+'''
+
+SRT_TEMPLATE = '''1
+00:00:{n:02d},000 --> 00:00:{n:02d},500
+[DOOR CREAKS]
+JOHN: Line  {n}...
+
+2
+00:00:{n:02d},540 --> 00:00:{n:02d},900
+- (laughs) Second line {n}
+- Yes.
+'''
+
+
+def test_convert_many():
+    for converter, template in (
+        (SMPTEConverter(), TTML_TEMPLATE),
+        (SAMIConverter(), SAMI_TEMPLATE),
+        (WebVTTConverter(), WEBVTT_TEMPLATE),
+    ):
+        inputs = [template.format(n=n) for n in range(1, 30)]
+        expected = [converter.from_string(data) for data in inputs]
+        assert all(expected)
+
+        assert converter.convert_many(inputs, workers=8) == expected
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert converter.convert_many([data.encode('utf-8') for data in inputs], executor=executor) == expected
+
+
+def test_process_many():
+    inputs = [SRT_TEMPLATE.format(n=n) for n in range(1, 50)] * 2
+    cache = LineCache(maxsize=20)
+    for processor, shared_processor in (
+        (CommonIssuesFixer(), CommonIssuesFixer(cache=cache)),
+        (SDHStripper(), SDHStripper(cache=cache)),
+        (CommonIssuesFixer(remove_gaps=False), CommonIssuesFixer(cache=cache, remove_gaps=False)),
+    ):
+        expected = [processor.from_string(data) for data in inputs]
+        assert shared_processor.process_many(inputs, workers=8) == expected
+        assert len(cache) <= 20
+
+    # Counts of rules are the same as when fixing lines one after another
+    stats, shared_stats = RuleStats(), RuleStats()
+    for data in inputs:
+        CommonIssuesFixer(rule_stats=stats).from_string(data)
+    CommonIssuesFixer(rule_stats=shared_stats).process_many(inputs, workers=8)
+    assert shared_stats.report() == stats.report()
+
+
+def test_line_cache_threads():
+    cache = LineCache(maxsize=50)
+
+    def run(offset):
+        for i in range(2000):
+            key = (offset + i) % 100
+            if cache.get(key) is None:
+                cache.put(key, str(key))
+
+    threads = [Thread(target=run, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = cache.info()
+    assert info.hits + info.misses == 8 * 2000
+    assert info.currsize == len(cache) == 50
+
+
+if __name__ == "__main__":
+    test_convert_many()
+    test_process_many()
+    test_line_cache_threads()
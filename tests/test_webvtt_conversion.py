@@ -75,7 +75,46 @@ def test_sorting_same_times_by_position():
     assert srt[6].content == 'Third line.'
 
 
+def test_iter_parse_matches_parse():
+    converter = WebVTTConverter()
+    srt = converter.parse(BytesIO(POSITION_SORT_TEST))
+    lines = list(converter.iter_parse(BytesIO(POSITION_SORT_TEST), reorder_window=len(srt)))
+
+    assert [(line.index, line.start, line.end, line.content) for line in lines] \
+        == [(line.index, line.start, line.end, line.content) for line in srt]
+
+
+def test_iter_parse_file_order():
+    converter = WebVTTConverter()
+    lines = list(converter.iter_parse(BytesIO(POSITION_SORT_TEST)))
+
+    assert [line.index for line in lines] == list(range(1, 8))
+    assert lines[0].content == 'that can happen in sports?"'
+    assert lines[1].content == '"What is the worst thing'
+
+
+def test_iter_parse_is_incremental():
+    def stream():
+        yield from BytesIO(b'WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nFirst line.\n\n')
+        raise AssertionError('Stream read past the first line')
+
+    line = next(WebVTTConverter().iter_parse(stream()))
+    assert line.content == 'First line.'
+
+
+def test_from_string_matches_from_bytes():
+    converter = WebVTTConverter()
+    for sample in (SPEAKER_TAG_TEST, POSITION_SORT_TEST):
+        for eol in (b'\n', b'\r\n'):
+            data = b'\xef\xbb\xbf' + sample.replace(b'\n', eol)
+            assert converter.from_string(data.decode('utf-8')) == converter.from_bytes(data)
+
+
 if __name__ == "__main__":
     test_speaker_tag_stripping()
     test_nested_italics_tag()
     test_sorting_same_times_by_position()
+    test_iter_parse_matches_parse()
+    test_iter_parse_file_order()
+    test_iter_parse_is_incremental()
+    test_from_string_matches_from_bytes()